@@ -0,0 +1,52 @@
+"""
+Timing harness for the ego selection strategies in centrality_strategies.
+Builds synthetic weighted subnetworks of 100 to 10k nodes and times each
+strategy, and the full sort ego selection used to do, so a strategy can
+be picked to fit a latency budget. Hybrid citation subnetworks are close
+to complete, which does not fit in memory at 10k nodes, so --average-degree
+sets how many edges each node gets instead.
+Run from the repository root: python -m benchmarks.bench_centrality_strategies
+"""
+# Importing necesary and relevant modules
+import argparse
+import random
+import time
+import networkx as nx
+from centrality_strategies import CENTRALITY_STRATEGIES
+
+# Defining functions
+def make_synthetic_subnetwork(n_nodes, average_degree, seed=0):
+    """Random subnetwork with avg(NCCC, NBCC)-like weights, mostly small and some zero"""
+    rng = random.Random(seed)
+    subnetwork = nx.gnm_random_graph(n_nodes, min(n_nodes * (n_nodes - 1) // 2, n_nodes * average_degree // 2), seed=seed)
+    for u, v in subnetwork.edges:
+        subnetwork[u][v]["weight"] = 0.0 if rng.random() < 0.3 else rng.betavariate(1, 8)
+    return subnetwork
+
+def sorted_weighted_degree(subnetwork, k=1, exclude=frozenset()):
+    """Ego selection as it was, fully sorting the weighted degrees"""
+    return [node for node, degree in sorted(subnetwork.degree(weight="weight"), key=lambda t: t[1], reverse=True) if node not in exclude][:k]
+
+def time_strategy(strategy, subnetwork, k, repeats):
+    """Best wall-clock time of a strategy over a number of repeats"""
+    best_time = float("inf")
+    for repeat in range(repeats):
+        start_time = time.perf_counter()
+        strategy(subnetwork, k)
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="numbers of nodes per subnetwork")
+    parser.add_argument("--average-degree", type=int, default=100, help="average number of edges per node")
+    parser.add_argument("--k", type=int, default=1, help="number of new egos selected per subnetwork")
+    parser.add_argument("--repeats", type=int, default=3, help="repeats per measurement, the best is reported")
+    parser.add_argument("--strategies", nargs="+", default=list(CENTRALITY_STRATEGIES), help="strategies to time")
+    args = parser.parse_args()
+    strategies = {"sorted_weighted_degree": sorted_weighted_degree, **{name: CENTRALITY_STRATEGIES[name] for name in args.strategies}}
+    print("nodes  edges    " + " ".join(f"{name:>24s}" for name in strategies))
+    for n_nodes in args.sizes:
+        subnetwork = make_synthetic_subnetwork(n_nodes, args.average_degree, seed=n_nodes)
+        timings = [time_strategy(strategy, subnetwork, args.k, args.repeats) for strategy in strategies.values()]
+        print(f"{n_nodes:<6d} {subnetwork.number_of_edges():<8d} " + " ".join(f"{seconds * 1000:21.2f} ms" for seconds in timings))
@@ -0,0 +1,50 @@
+"""
+Benchmark of alter-pair edge weighting with and without the citation index.
+Compares the reference calculate_egdeweight_between_alters loop, which copies
+the alter list and rebuilds every reference set for each pair, against
+CitationIndex on synthetic alters, and checks the weights are identical.
+Above --full-limit alters the reference is timed on a random sample of pairs
+and extrapolated, since its O(n^3) cost makes a full run impractical.
+Run from the repository root: python -m benchmarks.bench_citation_index
+"""
+# Importing necesary and relevant modules
+import argparse
+import itertools
+import random
+import time
+from edge_weights import calculate_egdeweight_between_alters
+from citation_index import CitationIndex
+from benchmarks.synthetic_citations import make_synthetic_alters
+
+# Defining functions
+def reference_edge_weight(alters_objects, u_index, v_index):
+    """Edge weight between two alters exactly as the original subnetwork loop computed it"""
+    u_object, v_object = alters_objects[u_index], alters_objects[v_index]
+    alters_less_uv_objects = alters_objects.copy()
+    alters_less_uv_objects.remove(u_object)
+    alters_less_uv_objects.remove(v_object)
+    return calculate_egdeweight_between_alters(u_object, v_object, alters_less_uv_objects)
+
+def run_benchmark(n_alters, full_limit, n_sampled_pairs):
+    """Time both implementations for n_alters synthetic alters and verify equal weights"""
+    alters_objects = make_synthetic_alters(n_alters, seed=n_alters)
+    start_time = time.time()
+    index_weights = {(u_index, v_index): edge_weight for u_index, v_index, edge_weight in CitationIndex(alters_objects).pairwise_edge_weights()}
+    index_time = time.time() - start_time
+    pairs = list(itertools.combinations(range(n_alters), 2))
+    sampled_pairs = pairs if n_alters <= full_limit else random.Random(0).sample(pairs, n_sampled_pairs)
+    start_time = time.time()
+    reference_weights = {pair: reference_edge_weight(alters_objects, *pair) for pair in sampled_pairs}
+    reference_time = (time.time() - start_time) * len(pairs) / len(sampled_pairs)
+    assert all(index_weights[pair] == reference_weights[pair] for pair in sampled_pairs), "Edge weights differ"
+    estimate = "" if len(sampled_pairs) == len(pairs) else f" (extrapolated from {len(sampled_pairs)} pairs)"
+    print(f"n = {n_alters:5d} | reference {reference_time:10.3f} s{estimate} | index {index_time:8.3f} s | speedup {reference_time / index_time:8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000], help="numbers of alters to benchmark")
+    parser.add_argument("--full-limit", type=int, default=200, help="largest n for which the reference runs on every pair")
+    parser.add_argument("--sampled-pairs", type=int, default=2000, help="pairs timed for the reference above --full-limit")
+    args = parser.parse_args()
+    for n_alters in args.sizes:
+        run_benchmark(n_alters, args.full_limit, args.sampled_pairs)
@@ -0,0 +1,77 @@
+"""
+Equivalence check and benchmark of the hybrid edge weight engines.
+Compares the pair-by-pair reference in edge_weights, CitationIndex and
+the sparse-matrix engine in hybrid_weights_matrix on synthetic alters,
+including a duplicated alter and a self-citation, and times the two
+fast engines up to thousands of alters.
+Run from the repository root: python -m benchmarks.bench_edge_weight_engines
+"""
+# Importing necesary and relevant modules
+import argparse
+import time
+import networkx as nx
+from edge_weights import calculate_edgeweight_between_ego_and_alter
+from citation_index import CitationIndex
+import hybrid_weights_matrix
+from benchmarks.synthetic_citations import make_synthetic_alters
+from benchmarks.bench_citation_index import reference_edge_weight
+
+# Defining functions
+def make_test_alters(n_alters, seed):
+    """Synthetic alters with a duplicated alter and an alter citing itself"""
+    alters_objects = make_synthetic_alters(n_alters, seed=seed)
+    alters_objects[0]["referenced_works"].append(alters_objects[0]["id"])
+    alters_objects.append(dict(alters_objects[1]))
+    return alters_objects
+
+def index_subnetwork(alters_objects):
+    """Subnetwork of alter edges built with CitationIndex"""
+    hcsn = nx.Graph()
+    for u_index, v_index, edge_weight in CitationIndex(alters_objects).pairwise_edge_weights():
+        hcsn.add_edge(alters_objects[u_index]["node_id"], alters_objects[v_index]["node_id"], weight=edge_weight)
+    return hcsn
+
+def matrix_subnetwork(alters_objects):
+    """Subnetwork of alter edges built with the sparse-matrix engine"""
+    hcsn = nx.Graph()
+    hybrid_weights_matrix.add_alter_edges(hcsn, alters_objects)
+    return hcsn
+
+def check_equivalence(n_alters):
+    """Assert that all three engines produce identical alter and ego-alter edge weights"""
+    alters_objects = make_test_alters(n_alters, seed=n_alters)
+    # Pairwise weights by position, which keeps duplicated alters apart
+    index = CitationIndex(alters_objects)
+    matrix_weights = hybrid_weights_matrix.alter_edge_weight_matrix(alters_objects).todok()
+    for u_index in range(len(alters_objects)):
+        for v_index in range(u_index + 1, len(alters_objects)):
+            reference_weight = reference_edge_weight(alters_objects, u_index, v_index)
+            assert index.edge_weight(u_index, v_index) == reference_weight, (u_index, v_index)
+            assert matrix_weights.get((u_index, v_index), 0.0) == reference_weight, (u_index, v_index)
+    assert nx.utils.graphs_equal(index_subnetwork(alters_objects), matrix_subnetwork(alters_objects))
+    ego_object = make_synthetic_alters(1, seed=n_alters + 1, id_offset=10 ** 6)[0]
+    ego_object["referenced_works"] += [alter_object["id"] for alter_object in alters_objects[:5]]
+    reference_weights = [calculate_edgeweight_between_ego_and_alter(set(ego_object["referenced_works"]), set(alter_object["referenced_works"])) for alter_object in alters_objects]
+    assert hybrid_weights_matrix.ego_alter_edge_weights(ego_object, alters_objects).tolist() == reference_weights
+    print(f"n = {len(alters_objects):5d} | reference, index and matrix engines agree")
+
+def run_benchmark(n_alters):
+    """Time CitationIndex and the sparse-matrix engine for n_alters synthetic alters"""
+    alters_objects = make_synthetic_alters(n_alters, seed=n_alters)
+    start_time = time.time()
+    list(CitationIndex(alters_objects).pairwise_edge_weights())
+    index_time = time.time() - start_time
+    start_time = time.time()
+    matrix_weights = hybrid_weights_matrix.alter_edge_weight_matrix(alters_objects)
+    matrix_time = time.time() - start_time
+    print(f"n = {n_alters:5d} | index {index_time:8.3f} s | matrix {matrix_time:8.3f} s | non-zero edges {matrix_weights.nnz}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check-sizes", type=int, nargs="+", default=[10, 60], help="numbers of alters checked against the reference")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 3000], help="numbers of alters to benchmark")
+    args = parser.parse_args()
+    for n_alters in args.check_sizes:
+        check_equivalence(n_alters)
+    for n_alters in args.sizes:
+        run_benchmark(n_alters)
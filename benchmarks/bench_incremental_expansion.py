@@ -0,0 +1,52 @@
+"""
+Benchmark of incremental expansion against level-by-level recomputation.
+Runs GAPRSPipeline with and without incremental=True on a synthetic
+citation corpus served from memory, checks both build the same hybrid
+citation network and levels of the same size, and reports the time and
+works fetched per level.
+Run from the repository root: python -m benchmarks.bench_incremental_expansion
+"""
+# Importing necesary and relevant modules
+import argparse
+import networkx as nx
+from gaprs_pipeline import GAPRSPipeline
+from benchmarks.fixture_client import FixtureClient
+from benchmarks.synthetic_citations import make_synthetic_corpus
+
+# Defining functions
+def run_pipeline(works, seed_ids, n_iterations, engine, incremental, latency):
+    """Run the pipeline on the corpus and return it with the works fetched at each level"""
+    client = FixtureClient(works, latency=latency)
+    pipeline = GAPRSPipeline(client=client, engine=engine, render_mode="none", save=False, verbose=False, incremental=incremental)
+    works_fetched = []
+    pipeline.select_egos(seed_ids)
+    pipeline.assemble_level_zero()
+    works_fetched.append(client.n_works_fetched)
+    for iteration in range(n_iterations):
+        pipeline.expand()
+        works_fetched.append(client.n_works_fetched)
+    pipeline.finish()
+    return pipeline, works_fetched
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--works", type=int, default=20000, help="number of works in the synthetic corpus")
+    parser.add_argument("--references", type=int, default=60, help="references per work")
+    parser.add_argument("--seeds", type=int, default=5, help="number of seed papers")
+    parser.add_argument("--iterations", type=int, default=4, help="expansion iterations")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per OpenAlex request")
+    parser.add_argument("--engine", choices=["matrix", "index"], default="index", help="edge weight engine")
+    args = parser.parse_args()
+    works = make_synthetic_corpus(args.works, args.references)
+    seed_ids = list(works)[-args.seeds:]
+    results = {}
+    for incremental in (False, True):
+        pipeline, works_fetched = run_pipeline(works, seed_ids, args.iterations, args.engine, incremental, args.latency)
+        results[incremental] = pipeline
+        mode = "incremental" if incremental else "standard"
+        print(f"{mode:11s} | total {sum(pipeline.level_times.values()):7.3f} s | works fetched {works_fetched[-1]:6d} | " + " ".join(f"L{level}={seconds:.3f}s" for level, seconds in pipeline.level_times.items()))
+    assert nx.utils.graphs_equal(results[False].hybrid_citation_network, results[True].hybrid_citation_network), "Networks differ"
+    level_sizes = {incremental: [(level_record["level"], level_record["nodes"], level_record["edges"]) for level_record in pipeline.metrics.levels] for incremental, pipeline in results.items()}
+    assert level_sizes[False] == level_sizes[True], f"Level sizes differ: {level_sizes}"
+    assert [ego["id"] for ego in results[False].egos] == [ego["id"] for ego in results[True].egos], "Recommendations differ"
+    print("Standard and incremental expansion build the same network, levels and recommendations")
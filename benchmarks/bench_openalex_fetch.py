@@ -0,0 +1,115 @@
+"""
+Local mock-server benchmark for the OpenAlex fetch engine.
+Serves synthetic works from a throttled HTTP server on localhost
+and compares the legacy two-calls-per-alter fetching against
+batched, concurrent fetching with OpenAlexClient, then repeats
+the batched fetch cold and warm through a WorkCache.
+Run from the repository root: python -m benchmarks.bench_openalex_fetch
+"""
+# Importing necesary and relevant modules
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from openalex_client import OpenAlexClient, short_openalex_id
+from work_cache import WorkCache
+
+# Defining functions
+def make_synthetic_work(work_index):
+    """Create a synthetic OpenAlex work with a handful of references and one author"""
+    return {
+        "id": f"https://openalex.org/W{work_index}",
+        "display_name": f"Synthetic Work {work_index}",
+        "publication_year": 2000 + work_index % 20,
+        "referenced_works": [f"https://openalex.org/W{(work_index * 7 + k) % 1000}" for k in range(5)],
+        "authorships": [{"author": {"id": f"https://openalex.org/A{work_index}", "display_name": f"Author {work_index}"}}],
+    }
+
+def select_fields(work, select):
+    """Project a work onto the comma-separated select parameter"""
+    return {field: work[field] for field in select.split(",") if field in work} if select else work
+
+def make_handler(works, latency, counter):
+    """Create a request handler that serves works with a fixed per-request latency"""
+    class MockOpenAlexHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with counter["lock"]:
+                counter["n_requests"] += 1
+            time.sleep(latency)
+            parsed_url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+            select = params.get("select")
+            if parsed_url.path.startswith("/works/"):
+                body = select_fields(works[short_openalex_id(parsed_url.path)], select)
+            else:
+                oa_ids = params["filter"].split(":", 1)[1].split("|")
+                body = {"results": [select_fields(works[oa_id], select) for oa_id in oa_ids if oa_id in works]}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+    return MockOpenAlexHandler
+
+def fetch_serially(base_url, oa_ids, fields):
+    """Legacy fetching: one request for the fields and one for authorships per work"""
+    works = {}
+    for oa_id in oa_ids:
+        work = requests.get(f"{base_url}/works/{short_openalex_id(oa_id)}?select={','.join(fields)}").json()
+        work["authorships"] = requests.get(f"{base_url}/works/{short_openalex_id(oa_id)}?select=authorships").json()["authorships"]
+        works[oa_id] = work
+    return works
+
+def run_benchmark(n_alters, latency, max_concurrency):
+    """Time legacy and batched fetching of n_alters works against the mock server"""
+    works = {f"W{i}": make_synthetic_work(i) for i in range(1000)}
+    counter = {"n_requests": 0, "lock": threading.Lock()}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(works, latency, counter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    oa_ids = [f"https://openalex.org/W{i}" for i in range(n_alters)]
+    fields = ["id", "display_name", "publication_year", "referenced_works"]
+    try:
+        start_time = time.time()
+        serial_works = fetch_serially(base_url, oa_ids, fields)
+        serial_time, serial_requests = time.time() - start_time, counter["n_requests"]
+        counter["n_requests"] = 0
+        client = OpenAlexClient(base_url=base_url, max_concurrency=max_concurrency)
+        start_time = time.time()
+        batched_works = client.get_works(oa_ids, fields + ["authorships"])
+        batched_time, batched_requests = time.time() - start_time, counter["n_requests"]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            work_cache = WorkCache(os.path.join(cache_dir, "works.sqlite"))
+            cached_requests = []
+            for run in range(2):
+                counter["n_requests"] = 0
+                cached_client = OpenAlexClient(base_url=base_url, max_concurrency=max_concurrency, cache=work_cache)
+                cached_client.get_works(oa_ids, fields + ["authorships"])
+                cached_requests.append(counter["n_requests"])
+            cache_stats = work_cache.stats()
+            work_cache.close()
+    finally:
+        server.shutdown()
+    assert serial_works == batched_works, "Batched fetching returned different works"
+    print(f"Alters: {n_alters} | Latency: {latency * 1000:.0f} ms | Concurrency: {max_concurrency}")
+    print(f"Serial:  {serial_requests:5d} requests {serial_time:8.3f} seconds")
+    print(f"Batched: {batched_requests:5d} requests {batched_time:8.3f} seconds")
+    print(f"Speedup: {serial_time / batched_time:.1f}x")
+    print(f"Cached:  {cached_requests[0]:5d} requests cold, {cached_requests[1]} requests warm | {cache_stats}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alters", type=int, default=300, help="number of referenced works to fetch")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock server latency per request in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of batches fetched at the same time")
+    args = parser.parse_args()
+    run_benchmark(args.alters, args.latency, args.concurrency)
@@ -0,0 +1,115 @@
+"""
+In-memory stand-in for OpenAlexClient used by the offline benchmarks.
+Serves works from a dict of OpenAlex work JSON keyed by ID URL and
+counts the requests and works the pipeline asks for, with no network.
+RecordingClient wraps a live OpenAlexClient and keeps every work and
+search result it returns, so a run can be saved as a fixture file and
+replayed later through FixtureClient.
+"""
+# Importing necesary and relevant modules
+import gzip
+import json
+import threading
+import time
+from openalex_client import openalex_id_url, chunk_ids, MAX_BATCH_SIZE, MAX_PAGE_SIZE
+
+# Defining functions
+def select_fields(work, fields):
+    """Project a work onto the selected fields"""
+    return {field: work[field] for field in fields if field in work}
+
+def load_fixture(path):
+    """Read a gzipped JSON fixture written by save_fixture"""
+    with gzip.open(path, "rt") as fixture_file:
+        return json.load(fixture_file)
+
+def save_fixture(path, fixture):
+    """Write a fixture as gzipped JSON"""
+    with gzip.open(path, "wt") as fixture_file:
+        json.dump(fixture, fixture_file)
+
+# Defining classes
+class FixtureClient:
+    """Answers get_work, get_works and iter_search_works from recorded or synthetic works"""
+
+    def __init__(self, works, search_results=None, batch_size=MAX_BATCH_SIZE, latency=0.0, request_slots=None):
+        self.works = works # OpenAlex work JSON keyed by ID URL
+        self.search_results = search_results or {} # Ordered work IDs returned for each search query
+        self.batch_size = batch_size
+        self.latency = latency # Simulated seconds per request, batches are assumed to run one at a time
+        self.request_slots = request_slots # Semaphore shared by clients competing for the same OpenAlex capacity, None for unlimited
+        self.n_requests = 0 # Number of requests OpenAlexClient would have sent
+        self.n_works_fetched = 0 # Number of works returned to the pipeline
+        self._counter_lock = threading.Lock() # Sessions of the recommendation service share one client
+
+    def _request(self, n_requests):
+        """Count requests and wait the simulated latency for each"""
+        with self._counter_lock:
+            self.n_requests += n_requests
+        if self.latency and self.request_slots is not None:
+            for request_index in range(n_requests):
+                with self.request_slots:
+                    time.sleep(self.latency)
+        elif self.latency:
+            time.sleep(self.latency * n_requests)
+
+    def iter_search_works(self, user_query, fields, max_results=None, per_page=MAX_PAGE_SIZE):
+        """Yield the recorded results of a search query, counting one request per page"""
+        oa_ids = self.search_results.get(user_query, [])[:max_results]
+        for result_index, oa_id in enumerate(oa_ids):
+            if result_index % per_page == 0:
+                self._request(1)
+            yield select_fields(self.works[oa_id], fields)
+
+    def get_work(self, oa_id, fields):
+        """Return a single work with only the selected fields"""
+        self._request(1)
+        with self._counter_lock:
+            self.n_works_fetched += 1
+        return select_fields(self.works[openalex_id_url(oa_id)], fields)
+
+    def get_works(self, oa_ids, fields):
+        """Return many works keyed by ID URL, counting one request per batch"""
+        fields = list(fields) if "id" in fields else ["id"] + list(fields)
+        unique_ids = [oa_id for oa_id in dict.fromkeys(openalex_id_url(oa_id) for oa_id in oa_ids) if oa_id in self.works]
+        self._request(len(chunk_ids(unique_ids, self.batch_size)))
+        with self._counter_lock:
+            self.n_works_fetched += len(unique_ids)
+        return {oa_id: select_fields(self.works[oa_id], fields) for oa_id in unique_ids}
+
+class RecordingClient:
+    """Forwards requests to an OpenAlex client and records the works and search results it returns"""
+
+    def __init__(self, client):
+        self.client = client
+        self.works = {} # Union of the fields returned for each work, keyed by the ID URL it was requested by
+        self.search_results = {} # Ordered work IDs returned for each search query
+
+    @property
+    def n_requests(self):
+        return self.client.n_requests
+
+    def _record(self, oa_id, work):
+        """Merge the fields of a returned work into the recording"""
+        self.works.setdefault(oa_id, {}).update(work)
+
+    def iter_search_works(self, user_query, fields, max_results=None, per_page=MAX_PAGE_SIZE):
+        """Stream search results from OpenAlex and record them in order"""
+        self.search_results[user_query] = []
+        for work in self.client.iter_search_works(user_query, fields, max_results, per_page):
+            self.search_results[user_query].append(work["id"])
+            self._record(work["id"], work)
+            yield work
+
+    def get_work(self, oa_id, fields):
+        """Fetch and record a single work"""
+        work = self.client.get_work(oa_id, fields)
+        self._record(openalex_id_url(oa_id), work)
+        return work
+
+    def get_works(self, oa_ids, fields):
+        """Fetch and record many works, merged works under the ID they were requested by"""
+        works = self.client.get_works(oa_ids, fields)
+        for oa_id, work in works.items():
+            self._record(oa_id, work)
+        return works
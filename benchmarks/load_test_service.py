@@ -0,0 +1,138 @@
+"""
+Load test of the multi-user recommendation service.
+Simulates N users exploring at the same time, each creating a session
+from seed papers, expanding it and asking for the final recommendations
+over HTTP. Seeds are drawn from a pool common to all users with the given
+overlap and from a pool of the user's own otherwise. The service answers
+from a synthetic corpus with simulated OpenAlex latency and a limit on the
+requests served at a time, since OpenAlex rate limits every client of a
+deployment together. The same sessions are also run as isolated pipelines
+with a client each, as separate processes of gaprs_batch would, to compare
+throughput and the OpenAlex requests sent at each overlap.
+The defaults model OpenAlex as the bottleneck, slow requests of which few
+are served at a time, where the service beats the isolated runs at every
+overlap because it sends fewer requests. Where requests are fast and
+plentiful, e.g. --latency 0.05 --backend-concurrency 8, sessions are bound
+by CPU instead and the service only wins when many seeds overlap: with
+none it is about as fast as or slower than the isolated runs.
+Run from the repository root:
+python -m benchmarks.load_test_service --sessions 16 --overlap 0 0.5 0.9
+Pass --url to load test a service that is already running instead; its
+corpus must then contain the seed IDs, e.g. W1 to W<works>.
+"""
+# Importing necesary and relevant modules
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from gaprs_pipeline import GAPRSPipeline
+from gaprs_service import RecommendationService, serve
+from benchmarks.fixture_client import FixtureClient
+from benchmarks.synthetic_citations import make_synthetic_corpus
+
+# Defining functions
+def draw_seed_ids(works, n_sessions, n_seeds, overlap, seed=0):
+    """Seed papers of each simulated user, each drawn from the common pool with probability overlap"""
+    rng = random.Random(seed)
+    # Recent works have the most references, like the papers users start from
+    candidate_ids = list(works)[len(works) // 2:]
+    rng.shuffle(candidate_ids)
+    common_pool = candidate_ids[:n_seeds * 2]
+    own_pools = [candidate_ids[n_seeds * 2 + user_index * n_seeds:n_seeds * 2 + (user_index + 1) * n_seeds] for user_index in range(n_sessions)]
+    sessions_seed_ids = []
+    for user_index in range(n_sessions):
+        seed_ids = set()
+        while len(seed_ids) < n_seeds:
+            seed_ids.add(rng.choice(common_pool) if rng.random() < overlap else rng.choice(own_pools[user_index]))
+        sessions_seed_ids.append(sorted(seed_ids))
+    return sessions_seed_ids
+
+def run_http_session(base_url, seed_ids, iterations, options):
+    """Explore as one user over HTTP and return the recommendations and seconds taken"""
+    start_time = time.time()
+    with requests.Session() as http_session:
+        response = http_session.post(f"{base_url}/sessions", json={"seed_ids": seed_ids, "options": options})
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+        for iteration in range(iterations):
+            http_session.post(f"{base_url}/sessions/{session_id}/expand", json={"iterations": 1}).raise_for_status()
+        response = http_session.post(f"{base_url}/sessions/{session_id}/finish")
+        response.raise_for_status()
+        recommendations = [ego["id"] for ego in response.json()["recommendations"]]
+        http_session.delete(f"{base_url}/sessions/{session_id}").raise_for_status()
+    return recommendations, time.time() - start_time
+
+def run_isolated_session(works, latency, request_slots, seed_ids, iterations, options):
+    """Explore as one user with a pipeline and client of their own and return the recommendations, seconds and requests"""
+    start_time = time.time()
+    client = FixtureClient(works, latency=latency, request_slots=request_slots)
+    pipeline = GAPRSPipeline(client=client, render_mode="none", save=False, verbose=False, incremental=True, **options)
+    egos = pipeline.run(seed_ids, iterations)
+    return [ego["id"] for ego in egos], time.time() - start_time, client.n_requests
+
+def load_test(base_url, sessions_seed_ids, iterations, options):
+    """Run every session at the same time against a service and return their results and the wall time"""
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=len(sessions_seed_ids)) as executor:
+        results = list(executor.map(lambda seed_ids: run_http_session(base_url, seed_ids, iterations, options), sessions_seed_ids))
+    return results, time.time() - start_time
+
+def load_test_isolated(works, latency, request_slots, sessions_seed_ids, iterations, options):
+    """Run every session at the same time in isolation and return their results and the wall time"""
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=len(sessions_seed_ids)) as executor:
+        results = list(executor.map(lambda seed_ids: run_isolated_session(works, latency, request_slots, seed_ids, iterations, options), sessions_seed_ids))
+    return results, time.time() - start_time
+
+def make_request_slots(backend_concurrency):
+    """Semaphore limiting the requests served at the same time, None when unlimited"""
+    return threading.BoundedSemaphore(backend_concurrency) if backend_concurrency else None
+
+def describe_latencies(results):
+    """Median and slowest session seconds"""
+    seconds = sorted(session_seconds for recommendations, session_seconds, *rest in results)
+    return f"median {seconds[len(seconds) // 2]:6.2f} s | max {seconds[-1]:6.2f} s"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16, help="number of concurrent users")
+    parser.add_argument("--seeds", type=int, default=3, help="seed papers per user")
+    parser.add_argument("--overlap", type=float, nargs="+", default=[0.0, 0.5, 0.9], help="probabilities of a seed coming from the common pool")
+    parser.add_argument("--iterations", type=int, default=2, help="expansion iterations per session")
+    parser.add_argument("--works", type=int, default=20000, help="number of works in the synthetic corpus")
+    parser.add_argument("--references", type=int, default=40, help="references per work")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per OpenAlex request")
+    parser.add_argument("--backend-concurrency", type=int, default=4, help="requests OpenAlex serves at the same time for all sessions together, 0 for unlimited")
+    parser.add_argument("--engine", choices=["matrix", "index"], default="index", help="edge weight engine of every session")
+    parser.add_argument("--max-alters-per-ego", type=int, default=None, help="keep only the alters sharing most references with each ego")
+    parser.add_argument("--url", default=None, help="load test this running service instead of one started here")
+    parser.add_argument("--no-isolated", action="store_true", help="skip the isolated sessions run for comparison")
+    args = parser.parse_args()
+    options = {"engine": args.engine, "max_alters_per_ego": args.max_alters_per_ego}
+    works = make_synthetic_corpus(args.works, args.references)
+    for overlap in args.overlap:
+        sessions_seed_ids = draw_seed_ids(works, args.sessions, args.seeds, overlap)
+        print(f"== OVERLAP {overlap:.2f} | {args.sessions} sessions | {len({seed_id for seed_ids in sessions_seed_ids for seed_id in seed_ids})} distinct seeds ==")
+        if args.url:
+            results, time_elapsed = load_test(args.url, sessions_seed_ids, args.iterations, options)
+            print(f"service  | {time_elapsed:6.2f} s | {60 * len(results) / time_elapsed:7.1f} sessions per minute | {describe_latencies(results)}")
+            continue
+        # A new service per overlap, so no run reuses the works of the one before
+        fixture_client = FixtureClient(works, latency=args.latency, request_slots=make_request_slots(args.backend_concurrency))
+        server = serve(RecommendationService(fixture_client), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            results, time_elapsed = load_test(f"http://127.0.0.1:{server.server_address[1]}", sessions_seed_ids, args.iterations, options)
+            shared_stats = requests.get(f"http://127.0.0.1:{server.server_address[1]}/stats").json()["shared_works"]
+        finally:
+            server.shutdown()
+            server.server_close()
+        print(f"service  | {time_elapsed:6.2f} s | {60 * len(results) / time_elapsed:7.1f} sessions per minute | {describe_latencies(results)} | {fixture_client.n_requests:5d} requests | {shared_stats['shared_hits']} shared, {shared_stats['coalesced']} coalesced lookups")
+        if args.no_isolated:
+            continue
+        isolated_results, isolated_time_elapsed = load_test_isolated(works, args.latency, make_request_slots(args.backend_concurrency), sessions_seed_ids, args.iterations, options)
+        print(f"isolated | {isolated_time_elapsed:6.2f} s | {60 * len(isolated_results) / isolated_time_elapsed:7.1f} sessions per minute | {describe_latencies(isolated_results)} | {sum(n_requests for recommendations, seconds, n_requests in isolated_results):5d} requests")
+        assert [recommendations for recommendations, *rest in results] == [recommendations for recommendations, *rest in isolated_results], "Shared and isolated sessions recommend differently"
+        print(f"Shared and isolated sessions make the same recommendations, {isolated_time_elapsed / time_elapsed:.2f}x throughput")
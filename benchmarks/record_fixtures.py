@@ -0,0 +1,58 @@
+"""
+Recorder of OpenAlex fixtures for the offline benchmark suite.
+Runs each query of a batch file (the gaprs_batch format, one JSON object
+per line with "query" and "ranks" or "seed_ids", optionally "name") once
+against the live OpenAlex API and saves every work and search result the
+pipeline received as benchmarks/fixtures/<name>.json.gz, so that
+benchmarks.run_suite can replay the run with no network. Needs network.
+benchmarks/user_queries.jsonl holds the five user queries of the thesis
+experiments with its settings of 3 selected recommendations out of the
+first 5 and 2 iterations, the ranks each user picked were not recorded.
+Run from the repository root:
+python -m benchmarks.record_fixtures benchmarks/user_queries.jsonl
+"""
+# Importing necesary and relevant modules
+import argparse
+import os
+from openalex_client import OpenAlexClient, OPENALEX_API_URL
+from gaprs_pipeline import GAPRSPipeline
+from gaprs_batch import read_batch_file
+from benchmarks.fixture_client import RecordingClient, save_fixture
+
+# Defining constants
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures") # Directory replayed by benchmarks.run_suite
+USER_QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "user_queries.jsonl") # User queries of the thesis experiments
+
+# Defining functions
+def record_job(job, client, iterations):
+    """Run one job through the pipeline against OpenAlex and return it as a fixture"""
+    recording_client = RecordingClient(client)
+    pipeline = GAPRSPipeline(client=recording_client, render_mode="none", save=False, user_query=job.get("query", ""), verbose=False)
+    seed_ids = job.get("seed_ids")
+    if seed_ids is None:
+        recommendations = pipeline.search(job["query"], n_results=job.get("n_results", job.get("per_page", 5)))
+        seed_ids = [recommendations[rank - 1]["id"] for rank in job["ranks"] if 1 <= rank <= len(recommendations)]
+    egos = pipeline.run(seed_ids, job.get("iterations", iterations))
+    return {
+        "job": dict(job, iterations=job.get("iterations", iterations)),
+        "seed_ids": seed_ids,
+        "recommendations": [ego["id"] for ego in egos],
+        "search_results": recording_client.search_results,
+        "works": recording_client.works,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("batch_file", nargs="?", default=USER_QUERIES_PATH, help="JSON lines file of queries and seed selections, the thesis user queries by default")
+    parser.add_argument("--iterations", type=int, default=2, help="expansion iterations per query unless the job sets its own")
+    parser.add_argument("--api-url", default=OPENALEX_API_URL, help="base URL of the OpenAlex API")
+    parser.add_argument("--mailto", default=None, help="e-mail address for the OpenAlex polite pool")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR, help="directory to write the fixtures to")
+    args = parser.parse_args()
+    os.makedirs(args.fixtures_dir, exist_ok=True)
+    for job_index, job in enumerate(read_batch_file(args.batch_file)):
+        name = job.get("name", f"user_query_{job_index + 1}")
+        client = OpenAlexClient(base_url=args.api_url, mailto=args.mailto)
+        fixture = record_job(job, client, args.iterations)
+        save_fixture(os.path.join(args.fixtures_dir, f"{name}.json.gz"), fixture)
+        print(f"{name}: {job.get('query', '')!r} | {len(fixture['works'])} works | {client.n_requests} HTTP requests")
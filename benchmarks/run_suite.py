@@ -0,0 +1,210 @@
+"""
+Offline benchmark suite of GAPRS, with no network.
+Replays every recorded OpenAlex fixture in benchmarks/fixtures (written
+by benchmarks.record_fixtures for the user queries) through the full
+pipeline, then stresses L0 assembly, subnetwork creation, composition,
+centrality and plotting on synthetic levels at multiples of the thesis
+scale, THESIS_EGOS egos of THESIS_REFERENCES references each.
+Every case keeps the best of --repeat runs, and results are written as
+JSON with the commit they were measured on. Given --baseline, cases are
+compared by name and the run fails on slowdowns beyond --tolerance or
+on replays whose recommendations or network sizes changed.
+Run from the repository root: python -m benchmarks.run_suite --scales 10 100 1000
+"""
+# Importing necesary and relevant modules
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import networkx as nx
+import hybrid_weights_matrix
+from gaprs_pipeline import GAPRSPipeline, assemble_hybrid_citation_network, create_hybrid_citation_subnetworks, calculate_alter_with_highest_centrality_measure
+from network_plotting import render_snapshot, EDGE_LABEL_THRESHOLD
+from benchmarks.fixture_client import FixtureClient, load_fixture
+from benchmarks.record_fixtures import FIXTURES_DIR
+from benchmarks.synthetic_citations import make_synthetic_level
+
+# Defining constants
+THESIS_EGOS = 3 # Egos selected per query in the thesis user queries, K = 3 in section 5.2.1
+THESIS_REFERENCES = 40 # Typical number of references of a paper in the thesis user queries
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results") # Default directory for result files
+ENGINES = ["index", "matrix"] if hybrid_weights_matrix.HAS_SCIPY else ["index"] # Edge weight engines available here
+
+# Defining functions
+def git_commit():
+    """Commit hash of the working tree being measured, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def best_of(repeat, run_case):
+    """Run a case repeat times and return the fastest time, all times and the last result"""
+    times, result = [], None
+    for repetition in range(repeat):
+        start_time = time.perf_counter()
+        result = run_case()
+        times.append(time.perf_counter() - start_time)
+    return min(times), times, result
+
+def replay_fixture(fixture, engine, incremental):
+    """Run the recorded job of a fixture through the full pipeline from memory"""
+    job = fixture["job"]
+    client = FixtureClient(fixture["works"], fixture["search_results"])
+    pipeline = GAPRSPipeline(client=client, engine=engine, render_mode="none", save=False, user_query=job.get("query", ""), verbose=False, incremental=incremental)
+    seed_ids = job.get("seed_ids")
+    if seed_ids is None:
+        recommendations = pipeline.search(job["query"], n_results=job.get("n_results", job.get("per_page", 5)))
+        seed_ids = [recommendations[rank - 1]["id"] for rank in job["ranks"] if 1 <= rank <= len(recommendations)]
+    egos = pipeline.run(seed_ids, job["iterations"])
+    return pipeline, client, egos
+
+def run_replays(fixtures_dir, engines, repeat):
+    """Benchmark the full pipeline on every recorded fixture with each engine, standard and incremental"""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.json.gz"))):
+        name = os.path.basename(path)[:-len(".json.gz")]
+        fixture = load_fixture(path)
+        for engine in engines:
+            for incremental in (False, True):
+                best_time, times, (pipeline, client, egos) = best_of(repeat, lambda: replay_fixture(fixture, engine, incremental))
+                cases.append({
+                    "name": f"replay/{name}/{engine}{'/incremental' if incremental else ''}",
+                    "seconds": best_time,
+                    "times": times,
+                    "recommendations": [ego["id"] for ego in egos],
+                    "nodes": pipeline.hybrid_citation_network.number_of_nodes(),
+                    "edges": pipeline.hybrid_citation_network.number_of_edges(),
+                    "requests": client.n_requests,
+                    "stages": pipeline.metrics.report()["stages"],
+                })
+                print_case(cases[-1])
+    return cases
+
+def run_synthetic_level(scale, engine, n_references, overlap, repeat):
+    """Benchmark each network building stage on a synthetic level at scale times the thesis size"""
+    ego_objects, alters_objects = make_synthetic_level(THESIS_EGOS * scale, n_references, overlap, seed=scale)
+    works_by_id = {alter_object["node_id"]: alter_object for ego_alters in alters_objects for alter_object in ego_alters}
+    ego_ids = frozenset(ego_object["node_id"] for ego_object in ego_objects)
+    prefix = f"synthetic/{scale}x/{engine}"
+    cases = []
+
+    def assemble():
+        hcn = nx.Graph()
+        assemble_hybrid_citation_network(hcn, ego_objects, alters_objects, engine)
+        return hcn
+    best_time, times, hcn = best_of(repeat, assemble)
+    cases.append({"name": f"{prefix}/assemble", "seconds": best_time, "times": times, "nodes": hcn.number_of_nodes(), "edges": hcn.number_of_edges()})
+
+    def create_subnetworks():
+        hcsn = []
+        create_hybrid_citation_subnetworks(hcn, hcsn, ego_objects, alters_objects, engine)
+        return hcsn
+    best_time, times, hcsn = best_of(repeat, create_subnetworks)
+    cases.append({"name": f"{prefix}/subnetworks", "seconds": best_time, "times": times, "edges": sum(subnet.number_of_edges() for subnet in hcsn)})
+
+    best_time, times, composed = best_of(repeat, lambda: nx.compose_all(hcsn))
+    cases.append({"name": f"{prefix}/composition", "seconds": best_time, "times": times, "nodes": composed.number_of_nodes(), "edges": composed.number_of_edges()})
+
+    best_time, times, new_egos = best_of(repeat, lambda: calculate_alter_with_highest_centrality_measure(hcsn, works_by_id, ego_ids))
+    cases.append({"name": f"{prefix}/centrality", "seconds": best_time, "times": times, "recommendations": [ego["id"] for ego in new_egos]})
+
+    for case in cases:
+        print_case(case)
+    return cases, hcn, composed, ego_ids
+
+def run_synthetic_plots(scale, networks, ego_ids, repeat, max_plot_nodes):
+    """Benchmark plotting the L0 network and the composed subnetworks of a synthetic level"""
+    cases = []
+    for plot_name, network in networks:
+        # Layout cost grows quadratically with the nodes, so only plot what can finish
+        if network.number_of_nodes() > max_plot_nodes:
+            continue
+        with tempfile.TemporaryDirectory() as dirpath:
+            snapshot = {
+                "hcn": network, "ego_ids": ego_ids, "iteration": 0, "datetimestamp": "bench", "time_taken": 0.0,
+                "dirpath": dirpath, "user_query": f"synthetic {scale}x", "edge_label_threshold": EDGE_LABEL_THRESHOLD,
+            }
+            best_time, times, (image_path, node_positions) = best_of(repeat, lambda: render_snapshot(snapshot))
+        cases.append({"name": f"synthetic/{scale}x/{plot_name}", "seconds": best_time, "times": times, "nodes": network.number_of_nodes(), "edges": network.number_of_edges()})
+        print_case(cases[-1])
+    return cases
+
+def print_case(case):
+    """Print one benchmark case on a line"""
+    sizes = " | ".join(f"{key} {case[key]}" for key in ("nodes", "edges", "requests") if key in case)
+    print(f"{case['name']:48s} {case['seconds']:10.4f} s" + (f" | {sizes}" if sizes else ""))
+
+def compare_results(baseline, current, tolerance, min_slowdown=0.01):
+    """Compare cases by name against a baseline run and return the regressions found"""
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    print(f"== COMPARISON WITH {baseline.get('commit')} ({baseline.get('timestamp')}) ==")
+    for case in current["cases"]:
+        baseline_case = baseline_cases.get(case["name"])
+        if baseline_case is None:
+            continue
+        ratio = case["seconds"] / baseline_case["seconds"] if baseline_case["seconds"] else float("inf")
+        # Timer noise dominates cases of a few milliseconds, so small absolute slowdowns are not regressions
+        slower = ratio > 1 + tolerance and case["seconds"] - baseline_case["seconds"] > min_slowdown
+        status = "SLOWER" if slower else "faster" if ratio < 1 - tolerance else "same"
+        # Replays and centrality must keep returning the same papers and network sizes
+        changed = [key for key in ("recommendations", "nodes", "edges") if key in case and key in baseline_case and case[key] != baseline_case[key]]
+        if changed:
+            status = f"CHANGED {', '.join(changed)}"
+        if status == "SLOWER" or changed:
+            regressions.append(case["name"])
+        print(f"{case['name']:48s} {baseline_case['seconds']:10.4f} s -> {case['seconds']:10.4f} s ({ratio:5.2f}x) {status}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="synthetic level sizes as multiples of the thesis scale")
+    parser.add_argument("--references", type=int, default=THESIS_REFERENCES, help="references per synthetic work")
+    parser.add_argument("--overlap", type=float, default=0.5, help="reference overlap between the alters of a synthetic ego")
+    parser.add_argument("--engines", choices=ENGINES, nargs="+", default=ENGINES, help="edge weight engines to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest is kept")
+    parser.add_argument("--max-plot-nodes", type=int, default=2500, help="largest network plotted")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR, help="directory of recorded fixtures to replay")
+    parser.add_argument("--output", default=None, help="result file, by default a new file in benchmarks/results")
+    parser.add_argument("--baseline", default=None, help="result file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative slowdown allowed before a case counts as a regression")
+    parser.add_argument("--min-slowdown", type=float, default=0.01, help="seconds a case must slow down by to count as a regression")
+    args = parser.parse_args()
+    datetimestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetimestamp,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "arguments": vars(args),
+        "cases": [],
+    }
+    print("== REPLAYED FIXTURES ==")
+    results["cases"] += run_replays(args.fixtures_dir, args.engines, args.repeat)
+    if not glob.glob(os.path.join(args.fixtures_dir, "*.json.gz")):
+        print(f"No fixtures in {args.fixtures_dir}, record the user queries with: python -m benchmarks.record_fixtures benchmarks/user_queries.jsonl")
+    print("== SYNTHETIC LEVELS ==")
+    for scale in args.scales:
+        for engine in args.engines:
+            cases, hcn, composed, ego_ids = run_synthetic_level(scale, engine, args.references, args.overlap, args.repeat)
+            results["cases"] += cases
+        # Plotting does not depend on the engine, so plot the networks of the last one
+        results["cases"] += run_synthetic_plots(scale, [("plot_l0", hcn), ("plot_subnetworks", composed)], ego_ids, args.repeat, args.max_plot_nodes)
+    output_path = args.output or os.path.join(RESULTS_DIR, f"suite_{datetimestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output_path}")
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_results(json.load(baseline_file), results, args.tolerance, args.min_slowdown)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,73 @@
+"""
+Synthetic citation data for GAPRS benchmarks.
+Generates alter objects shaped like the ones gaprs_cli builds from
+OpenAlex, with controllable reference counts, reference overlap and
+citations between the alters themselves.
+"""
+# Importing necesary and relevant modules
+import random
+
+# Defining functions
+def make_synthetic_alters(n_alters, n_references=30, overlap=0.5, internal_citation_rate=0.2, seed=0, id_offset=0):
+    """Create n_alters alter objects whose references partly overlap and partly cite other alters"""
+    rng = random.Random(seed)
+    alter_ids = [f"https://openalex.org/W{id_offset + i}" for i in range(n_alters)]
+    # Shared pool of references that drives bibliographic coupling, the smaller the more overlap
+    shared_pool_size = max(n_references, int(n_references * n_alters * (1 - overlap)) + 1)
+    shared_pool = [f"https://openalex.org/W{10 ** 9 + id_offset + i}" for i in range(shared_pool_size)]
+    alters_objects = []
+    for alter_index, alter_id in enumerate(alter_ids):
+        n_internal = min(n_alters - 1, int(n_references * internal_citation_rate))
+        internal_references = rng.sample([oa_id for oa_id in alter_ids if oa_id != alter_id], n_internal) if n_internal else []
+        shared_references = rng.sample(shared_pool, n_references - n_internal)
+        alters_objects.append({
+            "id": alter_id,
+            "display_name": f"Synthetic Work {id_offset + alter_index}",
+            "publication_year": 1990 + rng.randrange(35),
+            "referenced_works": internal_references + shared_references,
+            "first_author_name": f"Author {id_offset + alter_index}",
+            "first_author_id": f"https://openalex.org/A{id_offset + alter_index}",
+            "network_label": f"Author {id_offset + alter_index} {1990 + alter_index % 35}",
+            "node_id": id_offset + alter_index,
+        })
+    return alters_objects
+
+def make_synthetic_corpus(n_works, n_references=40, recency_bias=0.7, seed=0):
+    """Create OpenAlex-shaped works that cite earlier works, favouring well-cited ones so neighbourhoods overlap"""
+    rng = random.Random(seed)
+    works = {}
+    citation_targets = [] # Each work appears once per citation it received, for preferential attachment
+    for work_index in range(n_works):
+        referenced_indices = set()
+        n_work_references = min(work_index, n_references)
+        while len(referenced_indices) < n_work_references:
+            if citation_targets and rng.random() < recency_bias:
+                referenced_indices.add(rng.choice(citation_targets))
+            else:
+                referenced_indices.add(rng.randrange(work_index))
+        citation_targets.extend(referenced_indices)
+        works[f"https://openalex.org/W{work_index + 1}"] = {
+            "id": f"https://openalex.org/W{work_index + 1}",
+            "display_name": f"Synthetic Work {work_index + 1}",
+            "publication_year": 1970 + work_index * 55 // max(1, n_works),
+            "referenced_works": [f"https://openalex.org/W{referenced_index + 1}" for referenced_index in sorted(referenced_indices)],
+            "authorships": [{"author": {"id": f"https://openalex.org/A{work_index + 1}", "display_name": f"Author {work_index + 1}"}}],
+        }
+    return works
+
+def make_synthetic_level(n_egos, n_references=40, overlap=0.5, internal_citation_rate=0.2, shared_alter_rate=0.1, seed=0):
+    """Create the ego objects of one level and their alters, each ego sharing some alters with the one before it"""
+    # Every ego gets its own block of alter IDs and reference pool IDs, so blocks never collide
+    id_stride = n_references * (n_references + 1) + 1
+    ego_objects, alters_objects = [], []
+    for ego_index in range(n_egos):
+        ego_alters = make_synthetic_alters(n_references, n_references, overlap, internal_citation_rate, seed=seed + ego_index, id_offset=ego_index * id_stride)
+        n_shared = int(n_references * shared_alter_rate) if ego_index else 0
+        if n_shared:
+            # Alters shared between egos connect the egocentric networks of the level
+            ego_alters[:n_shared] = alters_objects[-1][-n_shared:]
+        ego_object = make_synthetic_alters(1, seed=seed + ego_index, id_offset=2 * 10 ** 9 + ego_index)[0]
+        ego_object["referenced_works"] = [alter_object["id"] for alter_object in ego_alters]
+        ego_objects.append(ego_object)
+        alters_objects.append(ego_alters)
+    return ego_objects, alters_objects
@@ -0,0 +1,75 @@
+"""
+Centrality strategies for choosing new egos in GAPRS.
+Each strategy ranks the nodes of an egocentric subnetwork and returns
+the IDs of the k most central ones, best first, leaving out the nodes in
+exclude before taking the top k, e.g. papers that are already egos when
+GAPRSPipeline runs with exclude_egos, so that they never take the place of
+the next-best alter. By default nothing is excluded. Ties keep the node
+iteration order, as sorting the degree view did. V and E are the numbers
+of nodes and edges of the subnetwork, which is close to complete for
+hybrid citation subnetworks since every alter pair gets an edge.
+"""
+# Importing necesary and relevant modules
+import heapq
+import networkx as nx
+
+# Defining constants
+DEFAULT_STRATEGY = "weighted_degree" # Strategy used in the thesis
+BETWEENNESS_SAMPLES = 64 # Source nodes sampled by approximate betweenness
+
+# Defining functions
+def top_k_nodes(scores, k=1, exclude=frozenset()):
+    """IDs of the k highest scoring nodes from (node, score) pairs not in exclude; O(V) for k = 1, O(V log k) otherwise"""
+    if exclude:
+        scores = ((node, score) for node, score in scores if node not in exclude)
+    if k == 1:
+        best = max(scores, key=lambda t: t[1], default=None)
+        return [] if best is None else [best[0]]
+    return [node for node, score in heapq.nlargest(k, scores, key=lambda t: t[1])]
+
+def weighted_degree(subnetwork, k=1, exclude=frozenset()):
+    """Sum of edge weights of each node, argmax instead of a full sort; O(V + E)"""
+    return top_k_nodes(subnetwork.degree(weight="weight"), k, exclude)
+
+def pagerank(subnetwork, k=1, exclude=frozenset()):
+    """Weighted PageRank by power iteration; O(I * E) for I iterations, uses SciPy"""
+    if not subnetwork:
+        return []
+    return top_k_nodes(nx.pagerank(subnetwork, weight="weight").items(), k, exclude)
+
+def eigenvector(subnetwork, k=1, exclude=frozenset()):
+    """Weighted eigenvector centrality by power iteration; O(I * E), falls back to weighted degree without convergence"""
+    if not subnetwork or not subnetwork.size(weight="weight"):
+        return weighted_degree(subnetwork, k, exclude)
+    try:
+        return top_k_nodes(nx.eigenvector_centrality(subnetwork, weight="weight", max_iter=500).items(), k, exclude)
+    except nx.PowerIterationFailedConvergence:
+        return weighted_degree(subnetwork, k, exclude)
+
+def approximate_betweenness(subnetwork, k=1, exclude=frozenset(), samples=BETWEENNESS_SAMPLES, seed=0):
+    """Betweenness from shortest paths of a sample of s source nodes, distance 1 - weight; O(s * (E + V log V))"""
+    if not subnetwork:
+        return []
+    scores = nx.betweenness_centrality(
+        subnetwork,
+        k=min(samples, len(subnetwork)),
+        weight=lambda u, v, edge_data: 1 - edge_data.get("weight", 0), # Strongly related papers are close together
+        seed=seed,
+    )
+    return top_k_nodes(scores.items(), k, exclude)
+
+# Defining variables
+CENTRALITY_STRATEGIES = {
+    "weighted_degree": weighted_degree,
+    "pagerank": pagerank,
+    "eigenvector": eigenvector,
+    "approximate_betweenness": approximate_betweenness,
+}
+
+def get_strategy(strategy):
+    """Look up a strategy by name, or return a callable strategy unchanged"""
+    if callable(strategy):
+        return strategy
+    if strategy not in CENTRALITY_STRATEGIES:
+        raise ValueError(f"Unknown centrality strategy {strategy!r}, expected one of {list(CENTRALITY_STRATEGIES)}")
+    return CENTRALITY_STRATEGIES[strategy]
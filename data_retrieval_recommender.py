@@ -3,23 +3,62 @@ Basic and simple prototype of GAPRS designed to
 take user query and return list of relevant
 items in an answer set through the OpenAlex API.
 No front-end or back-end, completely CLI-based.
+Results are streamed page by page with cursor pagination and
+can be written as NDJSON, one work per line, in constant memory.
+Usage: python data_retrieval_recommender.py "graph-based recommender systems" --max-results 500 --ndjson hits.ndjson
 Viewing Results: http://jsonprettyprint.net/
 """
 # Importing necesary and relevant modules
-import requests
+import argparse
+import json
+import sys
 from pprint import pprint
+from openalex_client import OpenAlexClient, OPENALEX_API_URL, MAX_PAGE_SIZE
 
-# Defining variables
-user_query = None # User's search query to be included in URL
-url = None # Complete URL to be sent to OpenAlex
-response = None # Response from request sent to OpenAlex
-reponse_json = None # JSON representation of response sent by OpenAlex
-# Presenting user with application welcome message
-print("Welcome to GAPRS: Graph-based Academic Paper Recommender System!")
-print("*This is a data-retrieval recommender prototype of GAPRS*")
-# Prompt user to enter search query
-user_query = input("Please enter the title of your thesis topic or your research question or keywords: ")
-url = f"https://api.openalex.org/works?search={user_query}&select=id,display_name"
-response = requests.get(url)
-response_json = response.json()
-pprint(response_json)
\ No newline at end of file
+# Defining constants
+SEARCH_FIELDS = ["id", "display_name"] # Information to display for each search result
+
+# Defining functions
+def write_ndjson(works, output_file):
+    """Write each work as one line of JSON as soon as it arrives and return the number written"""
+    n_works = 0
+    for work in works:
+        output_file.write(json.dumps(work) + "\n")
+        n_works += 1
+    return n_works
+
+def main():
+    """Stream the search results for a user query to the console or an NDJSON file"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("query", nargs="?", default=None, help="search query, asked for when not given")
+    parser.add_argument("--max-results", type=int, default=25, help="stop after this many results, 0 for all of them")
+    parser.add_argument("--per-page", type=int, default=MAX_PAGE_SIZE, help="results requested per page")
+    parser.add_argument("--fields", default=",".join(SEARCH_FIELDS), help="comma-separated fields selected for each work")
+    parser.add_argument("--ndjson", default=None, help="write results to this NDJSON file, - for standard output")
+    parser.add_argument("--api-url", default=OPENALEX_API_URL, help="base URL of the OpenAlex API")
+    parser.add_argument("--mailto", default=None, help="e-mail address for the OpenAlex polite pool")
+    args = parser.parse_args()
+    user_query = args.query # User's search query
+    if user_query is None:
+        # Presenting user with application welcome message
+        print("Welcome to GAPRS: Graph-based Academic Paper Recommender System!")
+        print("*This is a data-retrieval recommender prototype of GAPRS*")
+        # Prompt user to enter search query
+        user_query = input("Please enter the title of your thesis topic or your research question or keywords: ")
+    client = OpenAlexClient(base_url=args.api_url, mailto=args.mailto)
+    works = client.iter_search_works(user_query, args.fields.split(","), max_results=args.max_results or None, per_page=args.per_page)
+    if args.ndjson == "-":
+        n_works = write_ndjson(works, sys.stdout)
+    elif args.ndjson:
+        with open(args.ndjson, "w") as output_file:
+            n_works = write_ndjson(works, output_file)
+    else:
+        n_works = 0
+        for work in works:
+            pprint(work)
+            n_works += 1
+    # Keep standard output clean for piping NDJSON onward
+    print(f"{n_works} results in {client.n_requests} requests", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
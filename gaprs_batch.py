@@ -0,0 +1,136 @@
+"""
+Batch mode of GAPRS.
+Reads a file of queries and seed selections, one JSON object per line,
+and runs each through GAPRSPipeline in a process pool, e.g.
+{"query": "graph-based recommender systems", "ranks": [1, 3]}
+{"query": "citation analysis", "seed_ids": ["W2100837269"], "iterations": 1}
+{"query": "link prediction", "ranks": [12, 140], "n_results": 200}
+Reports throughput in queries per minute and, per query, the time spent
+in each pipeline stage summed over all levels.
+Usage: python gaprs_batch.py queries.jsonl --workers 4 --render none
+"""
+# Importing necesary and relevant modules
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from openalex_client import OpenAlexClient, OPENALEX_API_URL
+from work_cache import WorkCache
+from gaprs_pipeline import GAPRSPipeline, DEFAULT_ENGINE
+from network_plotting import RENDER_MODES
+from centrality_strategies import CENTRALITY_STRATEGIES, DEFAULT_STRATEGY
+from run_metrics import PROFILERS
+
+# Defining functions
+def read_batch_file(path):
+    """Read one job per non-empty line of a JSON lines file"""
+    with open(path) as batch_file:
+        return [json.loads(line) for line in batch_file if line.strip()]
+
+def process_job(job_index, job, options):
+    """Run the pipeline for one query and seed selection and return a summary of the results"""
+    start_time = time.time()
+    work_cache = WorkCache(options["cache_path"]) if options["cache_path"] else None
+    client = OpenAlexClient(base_url=options["api_url"], max_concurrency=options["max_concurrency"], cache=work_cache)
+    pipeline = GAPRSPipeline(
+        client=client,
+        engine=options["engine"],
+        render_mode=options["render_mode"],
+        save=options["save"],
+        output_dir=os.path.join(options["output_dir"], f"query_{job_index}"),
+        user_query=job.get("query", ""),
+        verbose=False,
+        centrality_strategy=options["centrality_strategy"],
+        egos_per_subnetwork=options["egos_per_subnetwork"],
+        exclude_egos=options["exclude_egos"],
+        profiler=options["profiler"],
+        checkpoint=options["checkpoint"],
+        min_edge_weight=options["min_edge_weight"],
+        max_alters_per_ego=options["max_alters_per_ego"],
+        max_nodes=options["max_nodes"],
+    )
+    try:
+        seed_ids = job.get("seed_ids")
+        if seed_ids is None:
+            # Select seeds by rank from the search results as a user would
+            recommendations = pipeline.search(job["query"], n_results=job.get("n_results", job.get("per_page", 5)))
+            seed_ids = [recommendations[rank - 1]["id"] for rank in job["ranks"] if 1 <= rank <= len(recommendations)]
+        egos = pipeline.run(seed_ids, job.get("iterations", options["iterations"]))
+    finally:
+        if work_cache is not None:
+            work_cache.close()
+    return {
+        "job": job_index,
+        "query": job.get("query", ""),
+        "seed_ids": seed_ids,
+        "recommendations": [{"id": ego["id"], "display_name": ego["display_name"], "network_label": ego["network_label"]} for ego in egos],
+        "level_times": pipeline.level_times,
+        "http_requests": client.n_requests,
+        "seconds": time.time() - start_time,
+        "metrics": pipeline.metrics.report(),
+    }
+
+def run_batch(jobs, options, workers):
+    """Process every job in a pool of worker processes and return the summaries in job order"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_job, job_index, job, options) for job_index, job in enumerate(jobs)]
+        return [future.result() for future in futures]
+
+def main():
+    """Parse command line arguments, run the batch and report throughput"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("batch_file", help="JSON lines file of queries and seed selections")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--iterations", type=int, default=2, help="expansion iterations per query unless the job sets its own")
+    parser.add_argument("--engine", choices=["matrix", "index"], default=DEFAULT_ENGINE, help="edge weight engine")
+    parser.add_argument("--centrality", choices=list(CENTRALITY_STRATEGIES), default=DEFAULT_STRATEGY, help="strategy choosing new egos")
+    parser.add_argument("--egos-per-subnetwork", type=int, default=1, help="new egos taken from each subnetwork per level")
+    parser.add_argument("--exclude-egos", action="store_true", help="rank only alters that are not egos yet, so no subnetwork is left without a new ego")
+    parser.add_argument("--min-edge-weight", type=float, default=None, help="never add edges between alters below this weight, zero weights included")
+    parser.add_argument("--max-alters-per-ego", type=int, default=None, help="keep only the alters sharing most references with each ego")
+    parser.add_argument("--max-nodes", type=int, default=None, help="evict the least central non-ego nodes beyond this many")
+    parser.add_argument("--api-url", default=OPENALEX_API_URL, help="base URL of the OpenAlex API")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent OpenAlex batches per worker")
+    parser.add_argument("--cache", default=os.path.join(os.getcwd(), "gaprs_work_cache.sqlite"), help="work cache file, empty to disable")
+    parser.add_argument("--output-dir", default=os.path.join(os.getcwd(), "gaprs_batch_output"), help="directory for plots and edgelists")
+    parser.add_argument("--results", default=None, help="write one JSON summary per query to this file")
+    parser.add_argument("--render", choices=RENDER_MODES, default="deferred", help="plot each level inline, in a background process, or not at all")
+    parser.add_argument("--no-save", action="store_true", help="do not save the final edgelists and metrics reports")
+    parser.add_argument("--checkpoint", action="store_true", help="save a binary snapshot of every level to resume from")
+    parser.add_argument("--profile", choices=[profiler for profiler in PROFILERS if profiler], default=None, help="profile each query and save the profile next to its edgelists")
+    args = parser.parse_args()
+    options = {
+        "api_url": args.api_url,
+        "cache_path": args.cache,
+        "max_concurrency": args.concurrency,
+        "engine": args.engine,
+        "render_mode": args.render,
+        "save": not args.no_save,
+        "output_dir": args.output_dir,
+        "iterations": args.iterations,
+        "centrality_strategy": args.centrality,
+        "egos_per_subnetwork": args.egos_per_subnetwork,
+        "exclude_egos": args.exclude_egos,
+        "profiler": args.profile,
+        "checkpoint": args.checkpoint,
+        "min_edge_weight": args.min_edge_weight,
+        "max_alters_per_ego": args.max_alters_per_ego,
+        "max_nodes": args.max_nodes,
+    }
+    jobs = read_batch_file(args.batch_file)
+    start_time = time.time()
+    summaries = run_batch(jobs, options, args.workers)
+    time_elapsed = time.time() - start_time
+    for summary in summaries:
+        print(f"Query {summary['job']}: {summary['query']!r} | {len(summary['recommendations'])} recommendations | {summary['http_requests']} HTTP requests | {summary['seconds']:.2f} seconds")
+        print("    " + " | ".join(f"{stage}: {seconds:.2f}s" for stage, seconds in summary["metrics"]["stages"].items()))
+    if args.results:
+        with open(args.results, "w") as results_file:
+            for summary in summaries:
+                results_file.write(json.dumps(summary) + "\n")
+    print("== BATCH COMPLETE ==")
+    print(f"Queries: {len(summaries)} | Time Elapsed: {time_elapsed:.2f} seconds | Throughput: {60 * len(summaries) / time_elapsed:.2f} queries per minute")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Importable, non-interactive GAPRS pipeline.
+Runs search -> select egos -> L0 assembly -> subnetwork ->
+centrality expansion with explicit parameters and no global
+state, so it can be embedded in a service, run in batch or
+benchmarked. gaprs_cli.py and gaprs_batch.py are thin wrappers.
+In incremental mode works already known are not fetched again, their
+reference sets and citations are reused across levels and ego-alter edges
+already in the network are not recalculated, so each level costs in
+proportion to what is new, with either edge weight engine. Both modes build
+the same network at every level: the composed subnetwork of a level holds
+only the subnetworks of its own egos, so it is composed anew rather than
+grown in place from the levels before.
+Memory is bounded by min_edge_weight, which never adds weaker edges
+between alters, max_alters_per_ego, which keeps the alters sharing most
+references with their ego, and max_nodes, which evicts the least central
+non-ego nodes and the works only they needed beyond the budget.
+Sessions of the recommendation service pass one shared registry, see
+shared_works, so works known to any session are not fetched again.
+With checkpoint=True every level is also saved as a binary snapshot,
+see network_snapshots, and GAPRSPipeline.resume carries on from any of
+them without refetching the works already known.
+"""
+# Importing necesary and relevant modules
+import heapq
+import networkx as nx
+import time
+import datetime
+import os
+from openalex_client import OpenAlexClient, openalex_id_url, openalex_int_id
+from edge_weights import calculate_edgeweight_between_ego_and_alter
+from citation_index import CitationIndex
+import hybrid_weights_matrix
+from network_plotting import NetworkRenderer
+from work_registry import WorkRegistry
+from centrality_strategies import DEFAULT_STRATEGY, get_strategy
+from run_metrics import RunMetrics
+from network_snapshots import save_network_snapshot, load_network_snapshot
+
+# Defining constants
+ITEM_INFO = ["id", "display_name", "publication_year"] # Information to display for each recommendation
+ALTERS_INFO = ["id", "display_name", "publication_year", "referenced_works"] # Information to display for each alter
+EGO_INFO = ALTERS_INFO + ["authorships"] # Information fetched for each ego selected by the user
+DEFAULT_ENGINE = "matrix" if hybrid_weights_matrix.HAS_SCIPY else "index" # Engine computing avg(NCCC, NBCC) edge weights
+
+# Defining functions
+def edgelist_label(node_id, node_label):
+    """Readable "Author Year" label of a node, kept unique by its OpenAlex ID"""
+    return f"{node_label} (W{node_id})" if node_label else f"W{node_id}"
+
+def save_hybrid_citation_network(hcn, datetimestamp, dirpath, iteration):
+    """Save the hybrid citation network in a TXT file in edgelist format"""
+    filename = f"{dirpath}/hcn_{datetimestamp}_L{iteration}_edgelist.txt"
+    node_labels = {node_id: edgelist_label(node_id, node_label) for node_id, node_label in hcn.nodes(data="label")}
+    nx.write_edgelist(nx.relabel_nodes(hcn, node_labels), filename, delimiter=", ", data=["weight"])
+
+def create_alter_object(alter_work):
+    """Create an alter object from the work information fetched from OpenAlex"""
+    alter_object = dict(alter_work)
+    authorships = alter_object.pop("authorships", None)
+    if authorships:
+        alter_object["first_author_name"] = authorships[0]["author"]["display_name"]
+        alter_object["first_author_id"] = authorships[0]["author"]["id"]
+        alter_object["network_label"] = alter_object["first_author_name"] + " " + str(alter_object["publication_year"])
+    else:
+        print(f"Anonymous ID: {alter_object['id']}")
+        alter_object["network_label"] = "Anonymous " + str(alter_object["publication_year"])
+    # Nodes are keyed by integer OpenAlex ID so distinct papers with the same label stay apart
+    alter_object["node_id"] = openalex_int_id(alter_object["id"])
+    return alter_object
+
+def calculate_alter_with_highest_centrality_measure(egocentric_subnetworks, works_by_id, ego_ids=frozenset(), strategy=DEFAULT_STRATEGY, k=1, exclude_egos=False):
+    """Calculates the k alter nodes with highest centrality measure in each egocentric subnetwork.
+    As in the thesis a paper that is already an ego is not recommended twice and its subnetwork gives no new ego,
+    with exclude_egos it is left out before ranking so that the next-best alter takes its place"""
+    rank_nodes = get_strategy(strategy)
+    new_ego_objects = []
+    for egocentric_subnetwork in egocentric_subnetworks:
+        for new_ego_id in rank_nodes(egocentric_subnetwork, k, exclude=ego_ids if exclude_egos else frozenset()):
+            # Papers that are already egos are not recommended twice
+            if new_ego_id not in ego_ids and new_ego_id in works_by_id:
+                new_ego_objects.append(works_by_id[new_ego_id])
+                ego_ids = ego_ids | {new_ego_id}
+    return new_ego_objects
+
+def collate_alters_objects(alters_objects, ego_objects, client, alters_info=ALTERS_INFO, registry=None, fetch_known=True):
+    """Collates each alter paper of ego paper into a list of objects"""
+    registry = registry if registry is not None else WorkRegistry()
+    # Fetch references in batched, concurrent requests with authorships in the same select, skipping known works unless asked
+    alter_oa_id_urls = [alter_oa_id_url for ego_object in ego_objects for alter_oa_id_url in ego_object['referenced_works']]
+    if not fetch_known:
+        alter_oa_id_urls = registry.unknown_ids(alter_oa_id_urls)
+    alter_works = client.get_works(alter_oa_id_urls, alters_info + ["authorships"]) if alter_oa_id_urls else {}
+    for ego_object_index, ego_object in enumerate(ego_objects):
+        # Iterating through every reference in reference section of ego paper
+        for alter_oa_id_url in ego_object['referenced_works']:
+            # Creating alter object for each reference in ego paper's references section, once per paper
+            node_id = openalex_int_id(alter_oa_id_url)
+            if node_id not in registry and alter_oa_id_url in alter_works:
+                registry.add(create_alter_object(alter_works[alter_oa_id_url]), node_id)
+            if node_id in registry:
+                alters_objects[ego_object_index].append(registry.get(node_id))
+    return registry
+
+def is_materialized(edge_weight, min_edge_weight=None):
+    """Whether an edge between alters is added, every edge without a minimum and only non-zero ones from it up otherwise"""
+    return min_edge_weight is None or (edge_weight > 0 and edge_weight >= min_edge_weight)
+
+def cap_alters(ego_object, ego_alters, max_alters):
+    """Keep the max_alters alters sharing the most references with the ego, in their original order"""
+    if max_alters is None or len(ego_alters) <= max_alters:
+        return ego_alters
+    # Shared references are a cheap stand-in for the ego-alter edge weight
+    ego_references = set(ego_object["referenced_works"])
+    ranked_indices = sorted(range(len(ego_alters)), key=lambda alter_index: -len(ego_references.intersection(ego_alters[alter_index]["referenced_works"])))
+    return [ego_alters[alter_index] for alter_index in sorted(ranked_indices[:max_alters])]
+
+def release_network(network):
+    """Drop the views networkx caches on a network, which refer back to it, so it is freed as soon as it is dropped instead of by the cycle collector"""
+    for cached_view in ("adj", "nodes", "edges", "degree"):
+        network.__dict__.pop(cached_view, None)
+
+def assemble_hybrid_citation_network(hcn, ego_objects, alters_objects, engine="index", registry=None, max_alters_per_ego=None):
+    """Connects hybrid citation egocentric network by adding edges between egos and their respective alters, returns the node IDs of the alters capped away"""
+    capped_ids = []
+    # Calculate edge weights between egos and their respective alters
+    for ego_object_index, ego_object in enumerate(ego_objects):
+        if max_alters_per_ego is not None:
+            # Capped alters are dropped from the ego's alters too, so its subnetwork leaves them out
+            kept_alters = cap_alters(ego_object, alters_objects[ego_object_index], max_alters_per_ego)
+            if len(kept_alters) < len(alters_objects[ego_object_index]):
+                kept_ids = {alter_object["node_id"] for alter_object in kept_alters}
+                capped_ids.extend(alter_object["node_id"] for alter_object in alters_objects[ego_object_index] if alter_object["node_id"] not in kept_ids)
+                alters_objects[ego_object_index][:] = kept_alters
+        if engine == "matrix":
+            new_alters_objects = alters_objects[ego_object_index]
+            if registry is not None:
+                # Edges between works do not change, so an edge from an earlier level is kept as is
+                new_alters_objects = [alter_object for alter_object in new_alters_objects if not hcn.has_edge(ego_object["node_id"], alter_object["node_id"])]
+            # Calculate every edge weight between ego and its alters in one vectorised pass
+            edge_weights = hybrid_weights_matrix.ego_alter_edge_weights(ego_object, new_alters_objects, registry).tolist()
+            hcn.add_weighted_edges_from((ego_object["node_id"], alter_object["node_id"], edge_weight) for alter_object, edge_weight in zip(new_alters_objects, edge_weights))
+            hcn.add_node(ego_object["node_id"], label=ego_object["network_label"])
+            hcn.add_nodes_from((alter_object["node_id"], {"label": alter_object["network_label"]}) for alter_object in new_alters_objects)
+            continue
+        # Create set of referenced works of ego once for all of its alters
+        ego_references = set(ego_object["referenced_works"])
+        hcn.add_node(ego_object["node_id"], label=ego_object["network_label"])
+        for alter_object in alters_objects[ego_object_index]:
+            if registry is not None:
+                # Edges between works do not change, so an edge from an earlier level is kept as is
+                if hcn.has_edge(ego_object["node_id"], alter_object["node_id"]):
+                    continue
+                alter_references = registry.references[alter_object["node_id"]]
+            else:
+                # Create set of referenced works of alter
+                alter_references = set(alter_object["referenced_works"])
+            # Calculate edge weight between ego and alter
+            edge_weight = calculate_edgeweight_between_ego_and_alter(ego_references, alter_references)
+            # Add edges between egos and their respective alters
+            hcn.add_edge(ego_object["node_id"], alter_object["node_id"], weight=edge_weight)
+            hcn.nodes[alter_object["node_id"]]["label"] = alter_object["network_label"]
+    return capped_ids
+
+def create_hybrid_citation_subnetworks(hcn, hcsn, ego_objects, alters_objects, engine="index", registry=None, min_edge_weight=None):
+    """Creates hybrid citation 1.5 degree egocentric subnetworks with egos excluded"""
+    for ego_object_index, ego_object in enumerate(ego_objects):
+        hcsn.append(nx.ego_graph(hcn, ego_object["node_id"], center=False))
+        if engine == "matrix":
+            # Calculate every edge weight between alters from sparse incidence matrix products
+            hybrid_weights_matrix.add_alter_edges(hcsn[ego_object_index], alters_objects[ego_object_index], min_edge_weight is None, min_edge_weight or 0.0, registry)
+            continue
+        # Index reference sets and citing alters once per ego instead of once per alter pair
+        citation_index = CitationIndex(alters_objects[ego_object_index], registry)
+        for u_index, v_index, edge_weight in citation_index.pairwise_edge_weights():
+            if min_edge_weight is not None and not is_materialized(edge_weight, min_edge_weight):
+                continue
+            u_object = alters_objects[ego_object_index][u_index]
+            v_object = alters_objects[ego_object_index][v_index]
+            # Add edge between alters u and v in 1.5 degree egocentric subnetwork
+            hcsn[ego_object_index].add_edge(u_object["node_id"], v_object["node_id"], weight=edge_weight)
+
+def search_recommendations(client, user_query, n_results=5):
+    """Search OpenAlex for the user query and rank the first n_results recommendations"""
+    # Stream pages of results and stop as soon as there are enough
+    recommendations = list(client.iter_search_works(user_query, ITEM_INFO, max_results=n_results))
+    for index, recommendation in enumerate(recommendations):
+        # Add rank to each recommendation item
+        recommendation["rank"] = index + 1
+    return recommendations
+
+def fetch_ego_objects(client, seed_ids):
+    """Fetch the references and first author of each seed paper and create its ego object"""
+    ego_works = client.get_works(seed_ids, EGO_INFO)
+    return [create_alter_object(ego_works[openalex_id_url(seed_id)]) for seed_id in seed_ids if openalex_id_url(seed_id) in ego_works]
+
+def display_time_elapsed(time_taken, iteration):
+    """Print time elapsed for current iteration based on given start and end times"""
+    print(f"== LEVEL {iteration} COMPLETE ==")
+    print(f"Time Elapsed L{iteration}: {time_taken:.2f} seconds")
+
+# Defining classes
+class GAPRSPipeline:
+    """Builds and expands one hybrid citation network from a set of seed papers"""
+
+    def __init__(self, client=None, engine=DEFAULT_ENGINE, render_mode="inline", save=True, output_dir=None, user_query="", verbose=True, incremental=False, centrality_strategy=DEFAULT_STRATEGY, egos_per_subnetwork=1, profiler=None, checkpoint=False, min_edge_weight=None, max_alters_per_ego=None, max_nodes=None, registry=None, exclude_egos=False):
+        self.client = client if client is not None else OpenAlexClient()
+        self.engine = engine # "matrix" or "index", see hybrid_weights_matrix and citation_index
+        self.renderer = NetworkRenderer(render_mode) # Plots the network at every level, see network_plotting.RENDER_MODES
+        self.save = save # Save the final egos-only network in edgelist format and the metrics report
+        self.user_query = user_query # User's search query shown in plot titles
+        self.verbose = verbose # Print progress to console
+        self.incremental = incremental # Reuse indexed works and edges across levels, see module docstring
+        self.centrality_strategy = centrality_strategy # Name or callable, see centrality_strategies.CENTRALITY_STRATEGIES
+        self.egos_per_subnetwork = egos_per_subnetwork # Number of new egos taken from each subnetwork per level
+        self.exclude_egos = exclude_egos # Rank only alters that are not egos yet, instead of skipping a subnetwork whose best node is one
+        self.checkpoint = checkpoint # Save a binary snapshot of every level to resume from
+        self.min_edge_weight = min_edge_weight # Edges between alters below this weight are never added, None keeps every edge
+        self.max_alters_per_ego = max_alters_per_ego # Alters kept per ego, ranked by references shared with it, None keeps all
+        self.max_nodes = max_nodes # Node budget of the network, the least central non-ego nodes are evicted beyond it
+        self.datetimestamp = datetime.datetime.today().strftime('%Y-%m-%d_%H-%M-%S') # Differentiate between files
+        self.output_dir = output_dir if output_dir is not None else os.path.join(os.getcwd(), f"hcn_{self.datetimestamp}")
+        self.parent_snapshot = None # Snapshot a resumed session carries on from
+        self.egos = [] # List to hold JSON objects representing each ego in egocentric networks
+        self.ego_ids = set() # Set to hold node IDs of designated egos of egocentric networks
+        self.registry = registry if registry is not None else WorkRegistry() # Works known to this session, or shared with others, with their reference sets
+        self.works_by_id = self.registry.works_by_id # Ego and alter objects keyed by integer OpenAlex ID for O(1) lookup
+        self.alters = [] # Alter objects of each ego currently being considered
+        self.ego_objects_snapshot = [] # Holds the egos of the egocentric networks currently being considered, i.e., L_I
+        self.ego_subnets_snapshot = [] # Holds the egocentric subnetworks currently being considered, i.e., L_I
+        self.subnetworks_pending = False # Subnetworks of the current egos are built but not yet expanded
+        self.hybrid_citation_network = nx.Graph() # Hybrid citation network where edge weights equal avg(NCCC, NBCC)
+        self.hybrid_citation_subnetworks = None # 1.5 degree egocentric subnets with egos excluded composed into one network
+        self.hybrid_citation_network_egos_only = None # Hybrid citation network where only egos are displayed
+        self.time_step = 0 # Monitors the iteration in the evolution of the hybrid citation network we are on
+        self.level_times = {} # Seconds taken to calculate each level
+        self.start_time = None # Monitor time taken for the level being calculated
+        self.metrics = RunMetrics(profiler) # Per-stage timings, HTTP and cache counters and level sizes
+
+    def search(self, user_query, n_results=5):
+        """Search OpenAlex for the user query and return ranked recommendations"""
+        self.user_query = user_query
+        with self.metrics.stage("search"):
+            return search_recommendations(self.client, user_query, n_results)
+
+    def select_egos(self, seed_ids):
+        """Fetch the seed papers and make them the egos of the L0 network"""
+        # Start counting time before L0 calculation
+        self.start_time = time.time()
+        self.metrics.start_profiler()
+        with self.metrics.stage("ego_fetch"):
+            ego_objects = fetch_ego_objects(self.client, seed_ids)
+        self.egos.extend(ego_objects)
+        self.ego_ids.update(ego_object["node_id"] for ego_object in ego_objects)
+        for ego_object in ego_objects:
+            self.registry.add(ego_object)
+        self.ego_objects_snapshot = ego_objects.copy()
+        return ego_objects
+
+    def _incremental_registry(self):
+        """Registry passed to the network functions in incremental mode, None otherwise"""
+        return self.registry if self.incremental else None
+
+    def _complete_level(self, hcn):
+        """Record, display and plot the level that was just calculated"""
+        time_elapsed = time.time() - self.start_time
+        self.level_times[self.time_step] = time_elapsed
+        if self.verbose:
+            display_time_elapsed(time_elapsed, self.time_step)
+        if self.renderer.render_mode != "none":
+            os.makedirs(self.output_dir, exist_ok=True)
+            with self.metrics.stage("render"):
+                self.renderer.render(hcn, self.ego_ids, self.time_step, self.datetimestamp, time_elapsed, self.output_dir, self.user_query)
+        if self.checkpoint:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with self.metrics.stage("save"):
+                self.save_snapshot(os.path.join(self.output_dir, f"hcn_{self.datetimestamp}_L{self.time_step}.npz"))
+        self.metrics.record_level(self.time_step, hcn, time_elapsed, self.client)
+        self.time_step += 1
+
+    def _enforce_node_budget(self, capped_ids=()):
+        """Evict the least central nodes beyond the node budget, sparing egos and the alters still to be expanded,
+        and forget the works evicted or capped in this step that no ego still needs"""
+        if self.max_nodes is None:
+            return
+        hcn = self.hybrid_citation_network
+        n_excess_nodes = hcn.number_of_nodes() - self.max_nodes
+        if n_excess_nodes <= 0 and not capped_ids:
+            return
+        with self.metrics.stage("eviction"):
+            protected_ids = self.ego_ids | {alter_object["node_id"] for ego_alters in self.alters for alter_object in ego_alters}
+            evicted_ids = []
+            if n_excess_nodes > 0:
+                periphery = ((node_id, centrality) for node_id, centrality in hcn.degree(weight="weight") if node_id not in protected_ids)
+                evicted_ids = [node_id for node_id, centrality in heapq.nsmallest(n_excess_nodes, periphery, key=lambda t: t[1])]
+                hcn.remove_nodes_from(evicted_ids)
+                if self.hybrid_citation_subnetworks is not None:
+                    self.hybrid_citation_subnetworks.remove_nodes_from(evicted_ids)
+            self.registry.remove([node_id for node_id in [*evicted_ids, *capped_ids] if node_id not in hcn and node_id not in protected_ids])
+
+    def assemble_level_zero(self):
+        """STEP 1: Assemble the hybrid weighted egocentric citation network of the selected egos"""
+        if self.start_time is None:
+            self.start_time = time.time()
+        # Fetch alter information for alters of egos
+        self.alters = [[] for i in range(len(self.ego_objects_snapshot))]
+        with self.metrics.stage("alter_fetch"):
+            collate_alters_objects(self.alters, self.ego_objects_snapshot, self.client, registry=self.registry, fetch_known=not self.incremental)
+        # Connect ego and alters in hcn
+        with self.metrics.stage("edge_weighting"):
+            capped_ids = assemble_hybrid_citation_network(self.hybrid_citation_network, self.ego_objects_snapshot, self.alters, self.engine, self._incremental_registry(), self.max_alters_per_ego)
+        self._enforce_node_budget(capped_ids)
+        self._complete_level(self.hybrid_citation_network)
+        return self.hybrid_citation_network
+
+    def expand(self):
+        """STEP 2 and 3: Create the egocentric subnetworks and expand them with their most central alters"""
+        # A session resumed from a subnetwork level only has the expansion left to do
+        if not self.subnetworks_pending:
+            self.create_subnetworks()
+        return self.expand_egos()
+
+    def create_subnetworks(self):
+        """STEP 2: Create the egocentric subnetworks of the current egos and compose them into one network"""
+        # Create 1.5 degree egocentric network for each ego
+        self.start_time = time.time()
+        self.ego_subnets_snapshot = []
+        with self.metrics.stage("edge_weighting"):
+            create_hybrid_citation_subnetworks(self.hybrid_citation_network, self.ego_subnets_snapshot, self.ego_objects_snapshot, self.alters, self.engine, self._incremental_registry(), self.min_edge_weight)
+        # Combine each 1.5 degree egocentric subnetwork with ego excluded into one network
+        with self.metrics.stage("composition"):
+            if self.hybrid_citation_subnetworks is not None:
+                release_network(self.hybrid_citation_subnetworks)
+            # Only the subnetworks of the current egos make up this level, in incremental mode too
+            self.hybrid_citation_subnetworks = nx.compose_all(self.ego_subnets_snapshot) if self.ego_subnets_snapshot else nx.Graph()
+        self.subnetworks_pending = True
+        self._complete_level(self.hybrid_citation_subnetworks)
+        return self.hybrid_citation_subnetworks
+
+    def expand_egos(self):
+        """STEP 3: Make the most central alters of each subnetwork new egos and connect them to their alters"""
+        # Calculating alter node with highest centrality measure in each egocentric subnetork
+        self.start_time = time.time()
+        with self.metrics.stage("centrality"):
+            new_ego_objects = calculate_alter_with_highest_centrality_measure(self.ego_subnets_snapshot, self.works_by_id, self.ego_ids, self.centrality_strategy, self.egos_per_subnetwork, self.exclude_egos)
+        # Fetch alter information for alters of new egos
+        new_alters = [[] for i in range(len(new_ego_objects))]
+        with self.metrics.stage("alter_fetch"):
+            collate_alters_objects(new_alters, new_ego_objects, self.client, registry=self.registry, fetch_known=not self.incremental)
+        # Move on to the new egos only once their alters are fetched, so a failed fetch leaves the level to be expanded again
+        self.ego_objects_snapshot = new_ego_objects
+        self.alters = new_alters
+        self.subnetworks_pending = False
+        for ego_subnet in self.ego_subnets_snapshot:
+            release_network(ego_subnet)
+        self.ego_subnets_snapshot = [] # Only needed until the new egos are chosen
+        # Add new ego objects to list of egos and their node IDs to set of ego IDs
+        self.egos.extend(self.ego_objects_snapshot)
+        self.ego_ids.update([ego_object["node_id"] for ego_object in self.ego_objects_snapshot])
+        # Connect ego and alters in hcn
+        with self.metrics.stage("edge_weighting"):
+            capped_ids = assemble_hybrid_citation_network(self.hybrid_citation_network, self.ego_objects_snapshot, self.alters, self.engine, self._incremental_registry(), self.max_alters_per_ego)
+        self._enforce_node_budget(capped_ids)
+        self._complete_level(self.hybrid_citation_network)
+        return self.hybrid_citation_network
+
+    def finish(self):
+        """Create the network of egos only and the connections between them"""
+        self.start_time = time.time()
+        self.hybrid_citation_network_egos_only = self.hybrid_citation_network.subgraph(self.ego_ids)
+        if self.save:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with self.metrics.stage("save"):
+                save_hybrid_citation_network(self.hybrid_citation_network_egos_only, self.datetimestamp, self.output_dir, self.time_step)
+        self._complete_level(self.hybrid_citation_network_egos_only)
+        # Wait for plots still being rendered in the background
+        self.renderer.close()
+        report_prefix = os.path.join(self.output_dir, f"hcn_{self.datetimestamp}")
+        # Always stop the profiler, a worker process would otherwise keep profiling every later job
+        self.metrics.stop_profiler(f"{report_prefix}_profile" if self.save else None)
+        if self.save:
+            self.metrics.write_json(f"{report_prefix}_metrics.json")
+            self.metrics.write_csv(f"{report_prefix}_metrics.csv")
+        return self.egos
+
+    def save_snapshot(self, path):
+        """Save the network, known works and expansion state as a binary snapshot"""
+        metadata = {
+            "level": self.time_step,
+            "datetimestamp": self.datetimestamp,
+            "user_query": self.user_query,
+            "level_times": self.level_times,
+            "engine": self.engine,
+            "incremental": self.incremental,
+            "centrality_strategy": self.centrality_strategy if isinstance(self.centrality_strategy, str) else None,
+            "egos_per_subnetwork": self.egos_per_subnetwork,
+            "exclude_egos": self.exclude_egos,
+            "subnetworks_pending": self.subnetworks_pending,
+            "min_edge_weight": self.min_edge_weight,
+            "max_alters_per_ego": self.max_alters_per_ego,
+            "max_nodes": self.max_nodes,
+            "parent_snapshot": self.parent_snapshot,
+        }
+        save_network_snapshot(
+            path, self.hybrid_citation_network, self.registry,
+            subnetwork=self.hybrid_citation_subnetworks,
+            # Per-ego subnetworks are only needed when their expansion is still to come
+            ego_subnetworks=self.ego_subnets_snapshot if self.subnetworks_pending else (),
+            ego_ids=[ego_object["node_id"] for ego_object in self.egos],
+            frontier_ids=[ego_object["node_id"] for ego_object in self.ego_objects_snapshot],
+            frontier_alters=self.alters,
+            metadata=metadata,
+        )
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        """Restore a pipeline from a snapshot so that expand and finish carry on after the saved level.
+        The resumed run writes its files under a timestamp of its own and records the snapshot as its parent"""
+        snapshot = load_network_snapshot(path)
+        metadata = snapshot["metadata"]
+        # Settings of the saved session apply unless overridden, output goes next to the snapshot
+        for setting in ("engine", "incremental", "centrality_strategy", "egos_per_subnetwork", "exclude_egos", "user_query", "min_edge_weight", "max_alters_per_ego", "max_nodes"):
+            if metadata.get(setting) is not None:
+                kwargs.setdefault(setting, metadata[setting])
+        kwargs.setdefault("output_dir", os.path.dirname(os.path.abspath(path)))
+        pipeline = cls(**kwargs)
+        # A new timestamp keeps the files of the original session from being overwritten by the resumed one
+        if pipeline.datetimestamp == metadata["datetimestamp"]:
+            pipeline.datetimestamp += "_resumed"
+        pipeline.parent_snapshot = os.path.abspath(path)
+        pipeline.registry = snapshot["registry"]
+        pipeline.works_by_id = pipeline.registry.works_by_id
+        pipeline.egos = [pipeline.registry.get(node_id) for node_id in snapshot["ego_ids"]]
+        pipeline.ego_ids = set(snapshot["ego_ids"])
+        pipeline.ego_objects_snapshot = [pipeline.registry.get(node_id) for node_id in snapshot["frontier_ids"]]
+        pipeline.alters = [[pipeline.registry.get(node_id) for node_id in alter_ids] for alter_ids in snapshot["frontier_alters"]]
+        pipeline.hybrid_citation_network = snapshot["hcn"]
+        pipeline.hybrid_citation_subnetworks = snapshot["subnetwork"]
+        pipeline.ego_subnets_snapshot = snapshot["ego_subnetworks"]
+        pipeline.subnetworks_pending = metadata["subnetworks_pending"]
+        pipeline.level_times = {int(level): seconds for level, seconds in metadata["level_times"].items()}
+        pipeline.time_step = metadata["level"] + 1
+        pipeline.metrics.level = pipeline.time_step
+        return pipeline
+
+    def run(self, seed_ids, n_iterations=2):
+        """Run the whole pipeline from seed paper IDs and return the final recommendations"""
+        self.select_egos(seed_ids)
+        self.assemble_level_zero()
+        for iteration in range(n_iterations):
+            self.expand()
+        return self.finish()
@@ -0,0 +1,394 @@
+"""
+Multi-user recommendation service of GAPRS.
+A long-running local HTTP/JSON server where each user explores in a
+session of their own, i.e., their own egos, levels and network, while
+every session fetches works through one shared_works.CoalescingClient and
+indexes them in one shared_works.SharedWorkRegistry. A paper several users
+reach is fetched and indexed once, so throughput grows with the overlap
+between their explorations instead of degrading linearly with their number.
+The registry holds the works of the open sessions and, for later sessions,
+up to --max-registry-works works no open session uses any more.
+Endpoints, all answering JSON:
+GET    /search?query=...&n_results=5      ranked search results
+POST   /sessions                          {"seed_ids": [...]} or {"query": ..., "ranks": [1, 3]},
+                                          optionally "iterations" and "options", returns the L0 egos
+POST   /sessions/<id>/expand              {"iterations": 1}, returns the new egos
+POST   /sessions/<id>/finish              final recommendations and the egos-only network
+GET    /sessions/<id>                     current state of a session
+DELETE /sessions/<id>                     close a session
+GET    /stats                             sessions, shared works and request coalescing counters
+Failed OpenAlex requests answer 503 and leave the session as it was, so the
+request can be sent again. A session left half way through a level by any
+other error answers 409 from then on and a new one has to be started.
+Usage: python gaprs_service.py --port 8000
+"""
+# Importing necesary and relevant modules
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+from openalex_client import OpenAlexClient, OPENALEX_API_URL
+from work_cache import WorkCache
+from gaprs_pipeline import GAPRSPipeline, search_recommendations, DEFAULT_ENGINE
+from centrality_strategies import CENTRALITY_STRATEGIES, DEFAULT_STRATEGY
+from shared_works import CoalescingClient, SharedWorkRegistry, SessionRegistry, DEFAULT_MAX_WORKS
+
+# Defining constants
+SESSION_OPTIONS = ["engine", "centrality_strategy", "egos_per_subnetwork", "exclude_egos", "min_edge_weight", "max_alters_per_ego"] # Pipeline settings a session may choose
+DEFAULT_SESSION_TTL = 60 * 60 # Seconds a session is kept after it was last used
+MAX_ITERATIONS = 10 # Expansion iterations allowed in one request
+WORK_ID_PATTERN = re.compile(r"(https://openalex\.org/)?W\d+") # Short or full OpenAlex work ID
+ROUTES = [
+    ("GET", re.compile(r"/stats"), "stats"),
+    ("GET", re.compile(r"/search"), "search"),
+    ("POST", re.compile(r"/sessions"), "create_session"),
+    ("GET", re.compile(r"/sessions/(\w+)"), "session_state"),
+    ("POST", re.compile(r"/sessions/(\w+)/expand"), "expand_session"),
+    ("POST", re.compile(r"/sessions/(\w+)/finish"), "finish_session"),
+    ("DELETE", re.compile(r"/sessions/(\w+)"), "close_session"),
+] # HTTP method, path pattern and RecommendationService method of each endpoint
+
+# Defining functions
+def summarize_work(work_object):
+    """Fields of an ego returned to users"""
+    return {field: work_object.get(field) for field in ("id", "display_name", "publication_year", "network_label")}
+
+def summarize_session(session):
+    """State of a session returned to users"""
+    pipeline = session.pipeline
+    return {
+        "session_id": session.session_id,
+        "user_query": pipeline.user_query,
+        "level": pipeline.time_step - 1,
+        "finished": session.finished,
+        "failed": session.failed,
+        "egos": [summarize_work(ego_object) for ego_object in pipeline.egos],
+        "new_egos": [summarize_work(ego_object) for ego_object in pipeline.ego_objects_snapshot],
+        "nodes": pipeline.hybrid_citation_network.number_of_nodes(),
+        "edges": pipeline.hybrid_citation_network.number_of_edges(),
+        "level_times": pipeline.level_times,
+    }
+
+def check_iterations(iterations):
+    """Number of expansion iterations requested, raises ValueError when out of range"""
+    iterations = int(iterations)
+    if not 0 <= iterations <= MAX_ITERATIONS:
+        raise ValueError(f"iterations must be between 0 and {MAX_ITERATIONS}")
+    return iterations
+
+def check_seed_ids(seed_ids):
+    """OpenAlex work IDs of the seed papers, raises ValueError unless they are a non-empty list of them"""
+    if not isinstance(seed_ids, list) or not seed_ids:
+        raise ValueError("seed_ids must be a non-empty list of OpenAlex work IDs")
+    for seed_id in seed_ids:
+        if not isinstance(seed_id, str) or not WORK_ID_PATTERN.fullmatch(seed_id):
+            raise ValueError(f"seed_ids must be OpenAlex work IDs such as 'W2741809807', not {seed_id!r}")
+    return seed_ids
+
+def check_ranks(ranks):
+    """Search result ranks to start from, raises ValueError unless they are a non-empty list of positive integers"""
+    if not isinstance(ranks, list) or not ranks or not all(is_positive_int(rank) for rank in ranks):
+        raise ValueError("ranks must be a non-empty list of positive integers")
+    return ranks
+
+def is_number(value):
+    """True for ints and floats, JSON booleans are not numbers here"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def is_positive_int(value):
+    """True for ints of at least 1"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+def check_options(options):
+    """Pipeline settings chosen by a session, raises ValueError for unknown or invalid ones"""
+    unknown_options = set(options) - set(SESSION_OPTIONS)
+    if unknown_options:
+        raise ValueError(f"Unknown session options: {sorted(unknown_options)}, choose from {SESSION_OPTIONS}")
+    if options.get("engine", DEFAULT_ENGINE) not in ("matrix", "index"):
+        raise ValueError("engine must be 'matrix' or 'index'")
+    if options.get("centrality_strategy", DEFAULT_STRATEGY) not in CENTRALITY_STRATEGIES:
+        raise ValueError(f"centrality_strategy must be one of {list(CENTRALITY_STRATEGIES)}")
+    if not is_positive_int(options.get("egos_per_subnetwork", 1)):
+        raise ValueError("egos_per_subnetwork must be a positive integer")
+    if not isinstance(options.get("exclude_egos", False), bool):
+        raise ValueError("exclude_egos must be true or false")
+    if options.get("max_alters_per_ego") is not None and not is_positive_int(options["max_alters_per_ego"]):
+        raise ValueError("max_alters_per_ego must be a positive integer or null")
+    if options.get("min_edge_weight") is not None and not (is_number(options["min_edge_weight"]) and options["min_edge_weight"] >= 0):
+        raise ValueError("min_edge_weight must be a non-negative number or null")
+    return options
+
+def make_handler(service):
+    """Request handler class answering the endpoints of a RecommendationService"""
+
+    class ServiceRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep connections alive between the requests of a session
+        disable_nagle_algorithm = True # The body follows the headers in a write of its own, which would otherwise wait on the client's delayed ACK
+
+        def log_message(self, format, *args):
+            if service.verbose:
+                super().log_message(format, *args)
+
+        def _send_json(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_params(self, query_string):
+            """Parameters of the request, from the JSON body or else the query string"""
+            content_length = int(self.headers.get("Content-Length") or 0)
+            if content_length:
+                params = json.loads(self.rfile.read(content_length))
+                if not isinstance(params, dict):
+                    raise ValueError("Request body must be a JSON object")
+                return params
+            return dict(parse_qsl(query_string))
+
+        def _dispatch(self, method):
+            url = urlsplit(self.path)
+            for route_method, pattern, service_method in ROUTES:
+                match = pattern.fullmatch(url.path.rstrip("/"))
+                if match and route_method == method:
+                    break
+            else:
+                self._send_json(404, {"error": f"No endpoint {method} {url.path}"})
+                return
+            try:
+                body = getattr(service, service_method)(*match.groups(), **self._read_params(url.query))
+            except UnknownSessionError as error:
+                self._send_json(404, {"error": error.args[0]})
+            except SessionFailedError as error:
+                self._send_json(409, {"error": str(error)})
+            except UpstreamError as error:
+                self._send_json(503, {"error": str(error)})
+            except (ValueError, TypeError) as error:
+                self._send_json(400, {"error": str(error)})
+            except Exception as error:
+                self._send_json(500, {"error": f"{type(error).__name__}: {error}"})
+            else:
+                self._send_json(200, body)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+    return ServiceRequestHandler
+
+def serve(service, host="127.0.0.1", port=8000):
+    """Create the HTTP server of a service, port 0 picks a free port"""
+    return ServiceHTTPServer((host, port), make_handler(service))
+
+# Defining classes
+class UnknownSessionError(KeyError):
+    """No open session has the requested ID"""
+
+class SessionFailedError(RuntimeError):
+    """A session was left half way through a level and cannot go on"""
+
+class UpstreamError(RuntimeError):
+    """OpenAlex could not be reached or kept failing, the session is unchanged"""
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """HTTP server answering every connection in a thread of its own"""
+    daemon_threads = True
+    request_queue_size = 128 # Pending connections, the default of 5 resets users arriving together
+
+class Session:
+    """One user's exploration: a pipeline of their own and a lock serializing their requests"""
+
+    def __init__(self, session_id, pipeline):
+        self.session_id = session_id
+        self.pipeline = pipeline
+        self.finished = False # Final recommendations were made, the session can only be read or closed
+        self.failed = None # Error that left the session half way through a level, it can only be read or closed
+        self.lock = threading.Lock()
+        self.last_used = time.time()
+
+class RecommendationService:
+    """Sessions of many users sharing fetched works, reference sets and in-flight fetches"""
+
+    def __init__(self, client=None, session_defaults=None, session_ttl=DEFAULT_SESSION_TTL, max_registry_works=DEFAULT_MAX_WORKS, verbose=False):
+        self.client = CoalescingClient(client if client is not None else OpenAlexClient()) # Shared by every session
+        self.registry = SharedWorkRegistry(max_registry_works) # Works known to any session with their reference sets
+        self.session_defaults = check_options(dict(session_defaults or {})) # Pipeline settings of sessions that choose none
+        self.session_ttl = session_ttl
+        self.verbose = verbose # Log every HTTP request to console
+        self.sessions = {} # Open sessions keyed by session ID
+        self.n_sessions_created = 0
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+
+    def _get_session(self, session_id):
+        with self._lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise UnknownSessionError(f"No session {session_id}")
+        return session
+
+    def _expire_sessions(self):
+        """Close the sessions nobody used within the session TTL"""
+        expiry_time = time.time() - self.session_ttl
+        with self._lock:
+            for session_id in [session_id for session_id, session in self.sessions.items() if session.last_used < expiry_time and not session.lock.locked()]:
+                # Works only this session used may now be forgotten
+                self.sessions.pop(session_id).pipeline.registry.release()
+
+    def _advance(self, session, step):
+        """Take a pipeline step of a session, failing the session when an error leaves it half way through a level"""
+        if session.failed is not None:
+            raise SessionFailedError(f"Session {session.session_id} failed earlier ({session.failed}), start a new session")
+        try:
+            step()
+        except requests.RequestException as error:
+            # Levels only move on once their works are fetched, so the session is as it was
+            raise UpstreamError(f"OpenAlex request failed, the session is unchanged and can be sent the request again: {error}") from error
+        except Exception as error:
+            session.failed = f"{type(error).__name__}: {error}"
+            raise SessionFailedError(f"Session {session.session_id} failed at level {session.pipeline.time_step} ({session.failed}), start a new session") from error
+
+    def search(self, query, n_results=5):
+        """Ranked search results of a query"""
+        try:
+            return {"query": query, "results": search_recommendations(self.client, query, int(n_results))}
+        except requests.RequestException as error:
+            raise UpstreamError(f"OpenAlex request failed: {error}") from error
+
+    def create_session(self, seed_ids=None, query="", ranks=None, n_results=5, iterations=0, options=None):
+        """Start a session from seed papers, or from search result ranks, and assemble its L0 network"""
+        self._expire_sessions()
+        iterations = check_iterations(iterations)
+        options = check_options(dict(self.session_defaults, **(options or {})))
+        if seed_ids is None:
+            if not query or not isinstance(query, str) or ranks is None:
+                raise ValueError("Give seed_ids, or a query and the ranks of the results to start from")
+            ranks = check_ranks(ranks)
+            recommendations = self.search(query, n_results)["results"]
+            seed_ids = [recommendations[rank - 1]["id"] for rank in ranks if rank <= len(recommendations)]
+            if not seed_ids:
+                raise ValueError(f"No search results at ranks {ranks}, {len(recommendations)} results were found")
+        seed_ids = check_seed_ids(seed_ids)
+        registry = SessionRegistry(self.registry)
+        pipeline = GAPRSPipeline(client=self.client, render_mode="none", save=False, user_query=query, verbose=False, incremental=True, registry=registry, **options)
+        # Nothing is kept of a session whose L0 network could not be assembled
+        try:
+            if not pipeline.select_egos(seed_ids):
+                raise ValueError(f"None of the seed papers {seed_ids} were found")
+            pipeline.assemble_level_zero()
+        except requests.RequestException as error:
+            registry.release()
+            raise UpstreamError(f"OpenAlex request failed: {error}") from error
+        except BaseException:
+            registry.release()
+            raise
+        session = Session(uuid.uuid4().hex, pipeline)
+        with self._lock:
+            self.sessions[session.session_id] = session
+            self.n_sessions_created += 1
+        if iterations:
+            return self.expand_session(session.session_id, iterations)
+        return summarize_session(session)
+
+    def expand_session(self, session_id, iterations=1):
+        """Expand a session by its most central alters"""
+        iterations = check_iterations(iterations)
+        session = self._get_session(session_id)
+        with session.lock:
+            if session.finished:
+                raise ValueError(f"Session {session_id} is finished")
+            for iteration in range(iterations):
+                self._advance(session, session.pipeline.expand)
+            session.last_used = time.time()
+            return summarize_session(session)
+
+    def finish_session(self, session_id):
+        """Make the final recommendations of a session and return them with the network of its egos"""
+        session = self._get_session(session_id)
+        with session.lock:
+            if not session.finished:
+                self._advance(session, session.pipeline.finish)
+                session.finished = True
+            session.last_used = time.time()
+            summary = summarize_session(session)
+            summary["recommendations"] = summary.pop("egos")
+            summary["network"] = [{"source": f"W{u}", "target": f"W{v}", "weight": weight} for u, v, weight in session.pipeline.hybrid_citation_network_egos_only.edges(data="weight")]
+            summary["stages"] = session.pipeline.metrics.report()["stages"]
+            return summary
+
+    def session_state(self, session_id):
+        """Current state of a session"""
+        session = self._get_session(session_id)
+        with session.lock:
+            return summarize_session(session)
+
+    def close_session(self, session_id):
+        """Forget a session"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise UnknownSessionError(f"No session {session_id}")
+        session.pipeline.registry.release()
+        return {"session_id": session_id, "closed": True}
+
+    def stats(self):
+        """Counters of the sessions and of the works they share"""
+        with self._lock:
+            n_sessions = len(self.sessions)
+        return {
+            "uptime_seconds": time.time() - self.start_time,
+            "sessions_open": n_sessions,
+            "sessions_created": self.n_sessions_created,
+            "registry_works": len(self.registry),
+            "registry_pinned_works": len(self.registry.pin_counts),
+            "registry_unpinned_works": len(self.registry.unpinned),
+            "registry_citations": len(self.registry.cited_by),
+            "shared_works": self.client.stats(),
+        }
+
+def main():
+    """Parse command line arguments and serve until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    parser.add_argument("--engine", choices=["matrix", "index"], default=DEFAULT_ENGINE, help="edge weight engine of sessions that choose none")
+    parser.add_argument("--centrality", choices=list(CENTRALITY_STRATEGIES), default=DEFAULT_STRATEGY, help="strategy choosing new egos in sessions that choose none")
+    parser.add_argument("--min-edge-weight", type=float, default=None, help="never add edges between alters below this weight")
+    parser.add_argument("--max-alters-per-ego", type=int, default=None, help="keep only the alters sharing most references with each ego")
+    parser.add_argument("--session-ttl", type=float, default=DEFAULT_SESSION_TTL, help="seconds an unused session is kept")
+    parser.add_argument("--max-registry-works", type=int, default=DEFAULT_MAX_WORKS, help="works no open session uses kept indexed for later sessions")
+    parser.add_argument("--api-url", default=OPENALEX_API_URL, help="base URL of the OpenAlex API")
+    parser.add_argument("--mailto", default=None, help="e-mail address for the OpenAlex polite pool")
+    parser.add_argument("--concurrency", type=int, default=8, help="OpenAlex requests in flight at once for all sessions together")
+    parser.add_argument("--cache", default=os.path.join(os.getcwd(), "gaprs_work_cache.sqlite"), help="work cache file, empty to disable")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+    work_cache = WorkCache(args.cache) if args.cache else None
+    client = OpenAlexClient(base_url=args.api_url, max_concurrency=args.concurrency, mailto=args.mailto, cache=work_cache)
+    session_defaults = {"engine": args.engine, "centrality_strategy": args.centrality, "min_edge_weight": args.min_edge_weight, "max_alters_per_ego": args.max_alters_per_ego}
+    service = RecommendationService(client, session_defaults, args.session_ttl, args.max_registry_works, verbose=args.verbose)
+    server = serve(service, args.host, args.port)
+    print(f"GAPRS service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if work_cache is not None:
+            work_cache.close()
+
+if __name__ == "__main__":
+    main()
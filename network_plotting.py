@@ -0,0 +1,147 @@
+"""
+Plotting of GAPRS hybrid citation networks, kept off the critical path.
+NetworkRenderer renders level snapshots in one of three modes:
+"none" skips plotting, "inline" plots before the pipeline continues and
+"deferred" queues snapshots to a background worker process so network
+expansion never waits on rendering. Layouts are seeded with the previous
+level's node positions so spring_layout converges in a few iterations,
+and edge labels are dropped above a size threshold.
+"""
+# Importing necesary and relevant modules
+import matplotlib
+matplotlib.use("Agg") # Plots are only ever saved to file, never shown
+import networkx as nx
+import matplotlib.pyplot as plt
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+# Defining constants
+RENDER_MODES = ("none", "deferred", "inline") # Supported render modes
+EDGE_LABEL_THRESHOLD = 150 # Edges above which edge weight labels are not drawn
+FULL_LAYOUT_ITERATIONS = 50 # spring_layout iterations for a layout from scratch
+INCREMENTAL_LAYOUT_ITERATIONS = 10 # spring_layout iterations when seeded with previous positions
+
+# Defining variables
+worker_positions = None # Node positions of the last level rendered by a deferred worker process, which serves one renderer only
+
+# Defining functions
+def distribute_centre_nodes_evenly(n_centre_nodes):
+    """Evenly distribute centre nodes (egos) around a circle"""
+    angle_increment = 2 * math.pi / n_centre_nodes
+    angle = 0 # Angle from centre of circle
+    x, y = None, None # Centre node's co-ordinates
+    centre_nodes_positions = [] # List containing co-ordinates of each centre node
+    for centre_node_index in range(n_centre_nodes):
+        x = math.cos(angle)
+        y = math.sin(angle)
+        centre_node_position = (x, y)
+        centre_nodes_positions.append(centre_node_position)
+        angle += angle_increment
+    return centre_nodes_positions
+
+def incremental_spring_layout(hcn, seed_positions=None):
+    """Spring layout seeded with known positions, new nodes start next to their positioned neighbours"""
+    seed_positions = {node: position for node, position in (seed_positions or {}).items() if node in hcn}
+    if not seed_positions:
+        return nx.spring_layout(hcn, weight=None, iterations=FULL_LAYOUT_ITERATIONS)
+    rng = random.Random(len(hcn))
+    initial_positions = dict(seed_positions)
+    for node in hcn.nodes:
+        if node not in initial_positions:
+            neighbour_positions = [seed_positions[neighbour] for neighbour in hcn.neighbors(node) if neighbour in seed_positions]
+            if neighbour_positions:
+                x = sum(position[0] for position in neighbour_positions) / len(neighbour_positions)
+                y = sum(position[1] for position in neighbour_positions) / len(neighbour_positions)
+            else:
+                x, y = rng.uniform(-1, 1), rng.uniform(-1, 1)
+            initial_positions[node] = (x + rng.uniform(-0.05, 0.05), y + rng.uniform(-0.05, 0.05))
+    return nx.spring_layout(hcn, pos=initial_positions, weight=None, iterations=INCREMENTAL_LAYOUT_ITERATIONS)
+
+def plot_hybrid_citation_network(hcn, ego_ids, iteration, datetimestamp, time_taken, dirpath, user_query, node_positions=None, edge_label_threshold=EDGE_LABEL_THRESHOLD):
+    """Plots the hybrid citation network and saves it as an image, returns the node positions used"""
+    # Set network display settings
+    if node_positions is None:
+        node_positions = nx.spring_layout(hcn, weight=None)
+    node_colors = ["red" if node_id in ego_ids else "blue" for node_id in hcn.nodes.keys()]
+    node_labels = {node_id: node_label if node_label is not None else node_id for node_id, node_label in hcn.nodes(data="label")}
+    # Draw network and save as image
+    figure = plt.figure(figsize=(10, 10), dpi=100)
+    plt.suptitle(f"Hybrid Citation Network (L{iteration}) | Nodes: Academic Papers | Edge Weights: avg(NCCC, NBCC)", verticalalignment="top", fontsize="large", fontweight="bold")
+    plt.title(f"User Query: {user_query} | Time Elapsed: {time_taken:.2f} seconds", fontdict={"fontsize": 10}, y=-0.01)
+    plt.axis("off")
+    nx.draw(hcn, node_color=node_colors, pos=node_positions, font_size=5, labels=node_labels, with_labels=True)
+    # Edge labels on dense networks cost more than the graph itself and are unreadable anyway
+    if hcn.number_of_edges() <= edge_label_threshold:
+        edge_weights_labels = {e: f"{hcn.edges[e]['weight']:.4f}" for e in hcn.edges}
+        nx.draw_networkx_edge_labels(hcn, pos=node_positions, edge_labels=edge_weights_labels, font_size=5)
+    plt.savefig(f"{dirpath}/hcn_{datetimestamp}_L{iteration}.png")
+    plt.close(figure)
+    return node_positions
+
+def render_snapshot(snapshot, seed_positions=None):
+    """Lay out and plot one level snapshot seeded with the previous level's positions, returns the image path and positions"""
+    node_positions = incremental_spring_layout(snapshot["hcn"], seed_positions)
+    plot_hybrid_citation_network(
+        snapshot["hcn"], snapshot["ego_ids"], snapshot["iteration"], snapshot["datetimestamp"],
+        snapshot["time_taken"], snapshot["dirpath"], snapshot["user_query"],
+        node_positions=node_positions, edge_label_threshold=snapshot["edge_label_threshold"],
+    )
+    return f"{snapshot['dirpath']}/hcn_{snapshot['datetimestamp']}_L{snapshot['iteration']}.png", node_positions
+
+def render_deferred_snapshot(snapshot):
+    """Render a snapshot in the background worker, seeding its layout with the level the worker rendered before"""
+    global worker_positions
+    image_path, worker_positions = render_snapshot(snapshot, worker_positions)
+    return image_path
+
+# Defining classes
+class NetworkRenderer:
+    """Renders level snapshots inline, in a background worker process, or not at all"""
+
+    def __init__(self, render_mode="inline", edge_label_threshold=EDGE_LABEL_THRESHOLD):
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {render_mode!r}, expected one of {RENDER_MODES}")
+        self.render_mode = render_mode
+        self.edge_label_threshold = edge_label_threshold
+        self.pending = [] # Futures of snapshots queued in deferred mode
+        self.node_positions = None # Node positions of the last level rendered inline
+        self._executor = None # Background worker process, started on the first deferred snapshot
+
+    def render(self, hcn, ego_ids, iteration, datetimestamp, time_taken, dirpath, user_query):
+        """Render one level of the network according to the render mode"""
+        if self.render_mode == "none":
+            return
+        snapshot = {
+            "hcn": nx.Graph(hcn) if self.render_mode == "deferred" else hcn, # Copy so later levels do not change what is drawn
+            "ego_ids": set(ego_ids),
+            "iteration": iteration,
+            "datetimestamp": datetimestamp,
+            "time_taken": time_taken,
+            "dirpath": dirpath,
+            "user_query": user_query,
+            "edge_label_threshold": self.edge_label_threshold,
+        }
+        if self.render_mode == "inline":
+            image_path, self.node_positions = render_snapshot(snapshot, self.node_positions)
+        else:
+            if self._executor is None:
+                # A single worker renders snapshots in order so each layout can build on the previous one,
+                # and exits on close() with the positions it kept
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            self.pending.append(self._executor.submit(render_deferred_snapshot, snapshot))
+
+    def wait(self):
+        """Block until every queued snapshot has been rendered and return the image paths"""
+        image_paths = [future.result() for future in self.pending]
+        self.pending = []
+        return image_paths
+
+    def close(self):
+        """Finish rendering queued snapshots and shut the background worker down"""
+        image_paths = self.wait()
+        self.node_positions = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return image_paths
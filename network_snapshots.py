@@ -0,0 +1,159 @@
+"""
+Binary snapshots of a GAPRS session for checkpointing and resuming.
+A snapshot is one uncompressed NPZ file of flat NumPy columns: integer
+OpenAlex node IDs, edge endpoints with a float32 weight array, node labels,
+every known work's attributes with its ordered references and cited-by
+index in CSR layout (an indptr array and a values array), and the state
+needed to carry on expanding. Loading turns the columns back into the
+network and a work_registry.WorkRegistry without any fetching or
+reindexing, so a long exploration resumes in milliseconds.
+"""
+# Importing necesary and relevant modules
+import json
+import numpy as np
+import networkx as nx
+from openalex_client import openalex_id_url, openalex_int_id
+from work_registry import WorkRegistry
+
+# Defining constants
+SNAPSHOT_VERSION = 1 # Bumped whenever the layout of the columns changes
+WEIGHT_DTYPE = np.float32 # Edge weights lie in [0, 1], float32 halves the weight column
+WORK_STRING_FIELDS = ("id", "display_name", "first_author_name", "first_author_id", "network_label") # Text attributes of work objects
+PRESENT, NONE, ABSENT = 0, 1, 2 # States of an optional work attribute
+
+# Defining variables
+_missing = object() # Marks an attribute a work object does not have
+
+# Defining functions
+def pack_lists(lists):
+    """CSR layout of a list of integer lists: offsets of each list into one flat int64 array"""
+    lengths = [len(values) for values in lists]
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    values = np.fromiter((value for values in lists for value in values), dtype=np.int64, count=int(indptr[-1]))
+    return indptr, values
+
+def unpack_lists(indptr, values):
+    """Inverse of pack_lists, returns a list of Python int lists"""
+    values, indptr = values.tolist(), indptr.tolist()
+    return [values[start:end] for start, end in zip(indptr[:-1], indptr[1:])]
+
+def pack_strings(values):
+    """Column of optional text values as a unicode array and the state of each value"""
+    states = np.array([ABSENT if value is _missing else NONE if value is None else PRESENT for value in values], dtype=np.int8)
+    strings = np.array([value if isinstance(value, str) else "" for value in values], dtype=str)
+    return strings, states
+
+def pack_graphs(prefix, graphs, weight_dtype=WEIGHT_DTYPE):
+    """Columns of the nodes and weighted edges of a list of graphs, in node and edge insertion order"""
+    node_indptr, node_ids = pack_lists([list(graph.nodes) for graph in graphs])
+    edges = [list(graph.edges(data="weight", default=0.0)) for graph in graphs]
+    edge_indptr = np.zeros(len(graphs) + 1, dtype=np.int64)
+    np.cumsum([len(graph_edges) for graph_edges in edges], out=edge_indptr[1:])
+    all_edges = [edge for graph_edges in edges for edge in graph_edges]
+    return {
+        f"{prefix}_node_indptr": node_indptr,
+        f"{prefix}_node_ids": node_ids,
+        f"{prefix}_edge_indptr": edge_indptr,
+        f"{prefix}_edge_u": np.fromiter((u for u, v, weight in all_edges), dtype=np.int64, count=len(all_edges)),
+        f"{prefix}_edge_v": np.fromiter((v for u, v, weight in all_edges), dtype=np.int64, count=len(all_edges)),
+        f"{prefix}_edge_weight": np.fromiter((weight for u, v, weight in all_edges), dtype=weight_dtype, count=len(all_edges)),
+    }
+
+def unpack_graphs(prefix, columns, node_labels):
+    """Inverse of pack_graphs, nodes get their label from node_labels"""
+    node_indptr, edge_indptr = columns[f"{prefix}_node_indptr"].tolist(), columns[f"{prefix}_edge_indptr"].tolist()
+    node_ids = columns[f"{prefix}_node_ids"].tolist()
+    edge_u, edge_v = columns[f"{prefix}_edge_u"].tolist(), columns[f"{prefix}_edge_v"].tolist()
+    edge_weight = columns[f"{prefix}_edge_weight"].astype(np.float64).tolist()
+    graphs = []
+    for graph_index in range(len(node_indptr) - 1):
+        graph = nx.Graph()
+        graph.add_nodes_from((node_id, {"label": node_labels.get(node_id)}) for node_id in node_ids[node_indptr[graph_index]:node_indptr[graph_index + 1]])
+        edge_slice = slice(edge_indptr[graph_index], edge_indptr[graph_index + 1])
+        graph.add_weighted_edges_from(zip(edge_u[edge_slice], edge_v[edge_slice], edge_weight[edge_slice]))
+        graphs.append(graph)
+    return graphs
+
+def pack_registry(registry):
+    """Columns of every work in a WorkRegistry with its references, cited-by index and merged-ID aliases"""
+    work_ids = [node_id for node_id, work_object in registry.works_by_id.items() if work_object["node_id"] == node_id]
+    works = [registry.works_by_id[node_id] for node_id in work_ids]
+    columns = {"work_ids": np.array(work_ids, dtype=np.int64)}
+    for field in WORK_STRING_FIELDS:
+        columns[f"work_{field}"], columns[f"work_{field}_state"] = pack_strings([work_object.get(field, _missing) for work_object in works])
+    publication_years = [work_object.get("publication_year") for work_object in works]
+    columns["work_publication_year"] = np.array([year if year is not None else 0 for year in publication_years], dtype=np.int32)
+    columns["work_publication_year_state"] = np.array([NONE if year is None else PRESENT for year in publication_years], dtype=np.int8)
+    # Referenced works keep their order, alters are created in that order
+    columns["work_references_indptr"], columns["work_references"] = pack_lists([[openalex_int_id(oa_id) for oa_id in work_object["referenced_works"]] for work_object in works])
+    cited_ids = list(registry.cited_by)
+    columns["cited_ids"] = np.array(cited_ids, dtype=np.int64)
+    columns["cited_by_indptr"], columns["cited_by"] = pack_lists([sorted(registry.cited_by[cited_id]) for cited_id in cited_ids])
+    aliases = [(node_id, work_object["node_id"]) for node_id, work_object in registry.works_by_id.items() if work_object["node_id"] != node_id]
+    columns["alias_ids"] = np.array([alias_id for alias_id, node_id in aliases], dtype=np.int64)
+    columns["alias_targets"] = np.array([node_id for alias_id, node_id in aliases], dtype=np.int64)
+    return columns
+
+def unpack_registry(columns):
+    """Inverse of pack_registry, fills a WorkRegistry without reindexing any references"""
+    registry = WorkRegistry()
+    work_ids = columns["work_ids"].tolist()
+    string_columns = {field: (columns[f"work_{field}"].tolist(), columns[f"work_{field}_state"].tolist()) for field in WORK_STRING_FIELDS}
+    publication_years = columns["work_publication_year"].tolist()
+    publication_year_states = columns["work_publication_year_state"].tolist()
+    references = unpack_lists(columns["work_references_indptr"], columns["work_references"])
+    for work_index, node_id in enumerate(work_ids):
+        work_object = {}
+        for field, (strings, states) in string_columns.items():
+            if states[work_index] != ABSENT:
+                work_object[field] = strings[work_index] if states[work_index] == PRESENT else None
+        work_object["publication_year"] = publication_years[work_index] if publication_year_states[work_index] == PRESENT else None
+        work_object["referenced_works"] = [openalex_id_url(f"W{referenced_id}") for referenced_id in references[work_index]]
+        work_object["node_id"] = node_id
+        registry.works_by_id[node_id] = work_object
+        registry.references[node_id] = frozenset(work_object["referenced_works"])
+    for cited_id, citing_ids in zip(columns["cited_ids"].tolist(), unpack_lists(columns["cited_by_indptr"], columns["cited_by"])):
+        registry.cited_by[cited_id] = set(citing_ids)
+    for alias_id, node_id in zip(columns["alias_ids"].tolist(), columns["alias_targets"].tolist()):
+        registry.works_by_id[alias_id] = registry.works_by_id[node_id]
+        registry.aliases.setdefault(node_id, []).append(alias_id)
+    return registry
+
+def save_network_snapshot(path, hcn, registry, subnetwork=None, ego_subnetworks=(), ego_ids=(), frontier_ids=(), frontier_alters=(), metadata=None, weight_dtype=WEIGHT_DTYPE):
+    """Write the network, the registry and the expansion state of a session to one NPZ file"""
+    node_ids = list(hcn.nodes)
+    columns = {
+        "metadata": np.array(json.dumps(dict(metadata or {}, version=SNAPSHOT_VERSION))),
+        "node_labels": pack_strings([hcn.nodes[node_id].get("label") for node_id in node_ids])[0],
+        **pack_graphs("hcn", [hcn], weight_dtype),
+        **pack_graphs("subnetwork", [subnetwork] if subnetwork is not None else [], weight_dtype),
+        **pack_graphs("ego_subnetworks", ego_subnetworks, weight_dtype),
+        **pack_registry(registry),
+        "ego_ids": np.array(list(ego_ids), dtype=np.int64),
+        "frontier_ids": np.array(list(frontier_ids), dtype=np.int64),
+    }
+    columns["frontier_alters_indptr"], columns["frontier_alters"] = pack_lists([[alter_object["node_id"] for alter_object in alters_objects] for alters_objects in frontier_alters])
+    # Uncompressed so loading is a straight read of each column
+    with open(path, "wb") as snapshot_file:
+        np.savez(snapshot_file, **columns)
+
+def load_network_snapshot(path):
+    """Read a snapshot written by save_network_snapshot and rebuild its networks and registry"""
+    with np.load(path, allow_pickle=False) as columns:
+        metadata = json.loads(columns["metadata"].item())
+        if metadata.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {metadata.get('version')!r} in {path}, expected {SNAPSHOT_VERSION}")
+        node_labels = dict(zip(columns["hcn_node_ids"].tolist(), columns["node_labels"].tolist()))
+        subnetworks = unpack_graphs("subnetwork", columns, node_labels)
+        registry = unpack_registry(columns)
+        return {
+            "metadata": metadata,
+            "hcn": unpack_graphs("hcn", columns, node_labels)[0],
+            "subnetwork": subnetworks[0] if subnetworks else None,
+            "ego_subnetworks": unpack_graphs("ego_subnetworks", columns, node_labels),
+            "registry": registry,
+            "ego_ids": columns["ego_ids"].tolist(),
+            "frontier_ids": columns["frontier_ids"].tolist(),
+            "frontier_alters": unpack_lists(columns["frontier_alters_indptr"], columns["frontier_alters"]),
+        }
@@ -0,0 +1,154 @@
+"""
+OpenAlex fetch engine for GAPRS.
+Batches work IDs into filter=openalex_id:A|B|C queries
+and fetches the batches concurrently over a pooled
+requests session instead of one blocking call per work.
+Searches stream their results with cursor pagination.
+An optional WorkCache answers repeated lookups without
+touching the network. At most max_concurrency requests are
+in flight per client however many threads share it, and
+requests OpenAlex rejects with 429 or 503 are retried with
+exponential backoff.
+"""
+# Importing necesary and relevant modules
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+# Defining constants
+OPENALEX_API_URL = "https://api.openalex.org" # Base URL of the OpenAlex API
+MAX_BATCH_SIZE = 50 # Maximum number of IDs OpenAlex accepts in one OR filter
+MAX_PAGE_SIZE = 200 # Maximum number of results OpenAlex returns per page
+DEFAULT_MAX_CONCURRENCY = 8 # Number of batches fetched at the same time
+RETRY_STATUS_CODES = (429, 503) # Rate limited or temporarily unavailable, worth asking again
+MAX_RETRIES = 5 # Retries of a rate limited request before giving up
+BACKOFF_SECONDS = 1.0 # Wait before the first retry, doubled after each one unless OpenAlex sends Retry-After
+
+# Defining functions
+def short_openalex_id(oa_id_url):
+    """Strip the https://openalex.org/ prefix from an OpenAlex ID URL"""
+    return oa_id_url.rsplit("/", 1)[-1]
+
+def openalex_id_url(oa_id):
+    """Normalise a short or full OpenAlex ID to its https://openalex.org/ URL form"""
+    return f"https://openalex.org/{short_openalex_id(oa_id)}"
+
+def openalex_int_id(oa_id):
+    """Compact integer form of an OpenAlex work ID, e.g. https://openalex.org/W2741809807 -> 2741809807"""
+    return int(short_openalex_id(oa_id)[1:])
+
+def chunk_ids(oa_ids, batch_size):
+    """Split a list of OpenAlex IDs into consecutive batches of at most batch_size"""
+    return [oa_ids[i:i + batch_size] for i in range(0, len(oa_ids), batch_size)]
+
+# Defining classes
+class OpenAlexClient:
+    """Pooled, batched and concurrent access to the OpenAlex works endpoint"""
+
+    def __init__(self, base_url=OPENALEX_API_URL, max_concurrency=DEFAULT_MAX_CONCURRENCY, batch_size=MAX_BATCH_SIZE, mailto=None, session=None, cache=None, request_slots=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = min(max(1, batch_size), MAX_BATCH_SIZE)
+        self.mailto = mailto # Optional e-mail address to join the OpenAlex polite pool
+        self.n_requests = 0 # Number of HTTP requests sent to OpenAlex by this client
+        self.n_bytes = 0 # Number of response body bytes received from OpenAlex
+        self.n_retries = 0 # Number of requests sent again after a 429 or 503
+        self.cache = cache # Optional WorkCache consulted before every work lookup
+        self._counter_lock = threading.Lock()
+        # Shared by every thread using this client, and by other clients when they are given the same semaphore
+        self.request_slots = request_slots if request_slots is not None else threading.BoundedSemaphore(self.max_concurrency)
+        self.session = session if session is not None else requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_json(self, path, params):
+        """Send one GET request to OpenAlex and return the decoded JSON body, backing off while rate limited"""
+        if self.mailto:
+            params = dict(params, mailto=self.mailto)
+        for attempt in range(MAX_RETRIES + 1):
+            with self._counter_lock:
+                self.n_requests += 1
+            with self.request_slots:
+                response = self.session.get(f"{self.base_url}{path}", params=params)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                break
+            with self._counter_lock:
+                self.n_retries += 1
+            # Wait without holding a request slot, so other requests can go ahead
+            retry_after = response.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else BACKOFF_SECONDS * 2 ** attempt)
+        response.raise_for_status()
+        with self._counter_lock:
+            self.n_bytes += len(response.content)
+        return response.json()
+
+    def iter_search_works(self, user_query, fields, max_results=None, per_page=MAX_PAGE_SIZE):
+        """Lazily yield works matching a search query page by page with cursor pagination, stopping after max_results"""
+        per_page = min(per_page, MAX_PAGE_SIZE, max_results) if max_results is not None else min(per_page, MAX_PAGE_SIZE)
+        n_results = 0 # Number of works yielded so far
+        cursor = "*" # OpenAlex starts cursor pagination from "*"
+        while cursor is not None and (max_results is None or n_results < max_results):
+            page = self._get_json("/works", {"search": user_query, "select": ",".join(fields), "per-page": per_page, "cursor": cursor})
+            for work in page["results"]:
+                yield work
+                n_results += 1
+                if max_results is not None and n_results >= max_results:
+                    return
+            cursor = page["meta"].get("next_cursor") if page["results"] else None
+
+    def _get_single(self, oa_id, fields):
+        """Fetch a single work from OpenAlex, following redirects of merged works"""
+        return self._get_json(f"/works/{short_openalex_id(oa_id)}", {"select": ",".join(fields)})
+
+    def get_work(self, oa_id, fields):
+        """Fetch a single work with only the selected fields"""
+        oa_id = openalex_id_url(oa_id)
+        if self.cache is not None:
+            work = self.cache.get(oa_id, fields)
+            if work is not None:
+                return work
+        work = self._get_single(oa_id, fields)
+        if self.cache is not None:
+            self.cache.put(oa_id, work, fields)
+        return work
+
+    def _get_batch(self, oa_ids, fields):
+        """Fetch one batch of works with a single openalex_id OR filter"""
+        params = {
+            "filter": "openalex_id:" + "|".join(short_openalex_id(oa_id) for oa_id in oa_ids),
+            "select": ",".join(fields),
+            "per-page": len(oa_ids),
+        }
+        return self._get_json("/works", params)["results"]
+
+    def get_works(self, oa_ids, fields):
+        """Fetch many works concurrently in batches and return a dict keyed by OpenAlex ID URL"""
+        # The ID is needed to match results back to the requested works
+        fields = list(fields) if "id" in fields else ["id"] + list(fields)
+        # Fetch every distinct work once, however many egos reference it
+        unique_ids = list(dict.fromkeys(openalex_id_url(oa_id) for oa_id in oa_ids))
+        works = self.cache.get_many(unique_ids, fields) if self.cache is not None else {}
+        missing_ids = [oa_id for oa_id in unique_ids if oa_id not in works]
+        fetched_works = {}
+        batches = chunk_ids(missing_ids, self.batch_size)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for batch_results in executor.map(lambda batch: self._get_batch(batch, fields), batches):
+                for work in batch_results:
+                    fetched_works[work["id"]] = work
+        # Merged works are returned under their new ID by the filter, so look them up one at a time
+        for oa_id in missing_ids:
+            if oa_id not in fetched_works:
+                try:
+                    fetched_works[oa_id] = self._get_single(oa_id, fields)
+                except requests.HTTPError as error:
+                    # Only a work OpenAlex does not have is missing, failed requests are not
+                    if error.response is None or error.response.status_code != 404:
+                        raise
+                    print(f"Missing ID: {oa_id}")
+        if self.cache is not None and fetched_works:
+            self.cache.put_many(fetched_works, fields)
+        works.update(fetched_works)
+        return works
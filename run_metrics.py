@@ -0,0 +1,149 @@
+"""
+Per-stage instrumentation of a GAPRS run.
+Times each stage (search, ego fetch, alter fetch, edge weighting,
+subnetwork composition, centrality, eviction, render, save) per
+level, records HTTP requests, bytes and cache hits, peak memory and
+the node and edge counts of every level, and exports a JSON or CSV
+report per run. Peak memory is that of the whole process, so in a batch
+worker it covers the jobs it ran before, and HTTP counters are left out
+for clients shared with other runs, whose traffic they would include.
+An optional cProfile or pyinstrument profiler can wrap the whole run.
+"""
+# Importing necesary and relevant modules
+import contextlib
+import cProfile
+import csv
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Defining constants
+STAGES = ("search", "ego_fetch", "alter_fetch", "edge_weighting", "composition", "centrality", "eviction", "render", "save") # Stages timed per level
+PROFILERS = (None, "cprofile", "pyinstrument") # Supported profilers
+COUNTERS = ("http_requests", "http_bytes", "cache_hits", "cache_misses") # Client counters recorded per level
+
+# Defining functions
+def process_peak_memory_bytes():
+    """Peak resident set size of this process since it started in bytes, or None where it cannot be measured"""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+def client_counters(client):
+    """HTTP and cache counters of an OpenAlex client, zero for counters it does not keep and none for a shared client"""
+    if getattr(client, "shared", False):
+        return {}
+    cache = getattr(client, "cache", None)
+    return {
+        "http_requests": getattr(client, "n_requests", 0),
+        "http_bytes": getattr(client, "n_bytes", 0),
+        "cache_hits": cache.hits if cache is not None else 0,
+        "cache_misses": cache.misses if cache is not None else 0,
+    }
+
+# Defining classes
+class RunMetrics:
+    """Stage timings, counters and level sizes of one pipeline run"""
+
+    def __init__(self, profiler=None):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+        self.level = 0 # Level that stage timings are currently attributed to
+        self.stage_times = {} # Seconds spent in each stage, keyed by (level, stage)
+        self.levels = [] # One record per completed level
+        self.start_time = time.time()
+        self._last_counters = {} # Client counters at the end of the previous level
+        self._profiler_name = profiler
+        self._profiler = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one stage of the current level"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = (self.level, name)
+            self.stage_times[key] = self.stage_times.get(key, 0.0) + time.perf_counter() - start_time
+
+    def record_level(self, level, hcn, time_elapsed, client=None):
+        """Record the size, duration and counters of a completed level and move on to the next"""
+        counters = client_counters(client) if client is not None else {}
+        self.levels.append({
+            "level": level,
+            "seconds": time_elapsed,
+            "nodes": hcn.number_of_nodes(),
+            "edges": hcn.number_of_edges(),
+            "stages": {stage: seconds for (stage_level, stage), seconds in self.stage_times.items() if stage_level == level},
+            # Counters are cumulative on the client, so report what this level added
+            **{name: value - self._last_counters.get(name, 0) for name, value in counters.items()},
+            "process_peak_memory_bytes": process_peak_memory_bytes(),
+        })
+        self._last_counters = counters
+        self.level = level + 1
+
+    def start_profiler(self):
+        """Start the configured profiler, if any"""
+        if self._profiler_name == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self._profiler_name == "pyinstrument":
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    def stop_profiler(self, path=None):
+        """Stop the profiler and write its output, .prof for cProfile and .html for pyinstrument, unless path is None"""
+        if self._profiler is None:
+            return None
+        profiler, self._profiler = self._profiler, None
+        if self._profiler_name == "cprofile":
+            profiler.disable()
+            if path is not None:
+                path = f"{path}.prof"
+                profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            if path is not None:
+                path = f"{path}.html"
+                with open(path, "w") as profile_file:
+                    profile_file.write(profiler.output_html())
+        return path
+
+    def report(self):
+        """Whole-run totals, per-stage totals and the per-level records as one dict"""
+        stage_totals = {}
+        for (level, stage), seconds in self.stage_times.items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+        return {
+            "wall_seconds": time.time() - self.start_time,
+            "level_seconds": sum(level_record["seconds"] for level_record in self.levels),
+            "stages": stage_totals,
+            # Counters a shared client left out are missing rather than zero
+            **{name: sum(level_record[name] for level_record in self.levels if name in level_record) for name in COUNTERS if any(name in level_record for level_record in self.levels)},
+            "process_peak_memory_bytes": process_peak_memory_bytes(),
+            "levels": self.levels,
+        }
+
+    def write_json(self, path):
+        """Write the report as JSON"""
+        with open(path, "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
+
+    def write_csv(self, path):
+        """Write one row per level with a column per stage"""
+        columns = ["level", "seconds", "nodes", "edges", *STAGES, *COUNTERS, "process_peak_memory_bytes"]
+        with open(path, "w", newline="") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=columns)
+            writer.writeheader()
+            for level_record in self.levels:
+                row = {column: level_record.get(column, "") for column in columns}
+                row.update({stage: f"{level_record['stages'].get(stage, 0.0):.6f}" for stage in STAGES})
+                writer.writerow(row)
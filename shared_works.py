@@ -0,0 +1,265 @@
+"""
+Work state shared by the concurrent sessions of the GAPRS service.
+CoalescingClient sits in front of an OpenAlex client, keeps every work
+fetched for any session and fetches each work ID once however many
+sessions ask for it at the same time: later requests for an ID already
+being fetched wait for the batch fetching it instead of sending their own.
+SharedWorkRegistry is a thread-safe work_registry.WorkRegistry whose
+cited-by entries are append-only lists, so a session indexing its alters
+can iterate them while another session adds works. Each session uses it
+through a SessionRegistry that pins the works the session relies on.
+Works no open session pins are kept for later sessions up to a limit,
+beyond which the least recently released are forgotten, so memory follows
+the open sessions rather than every work the service ever indexed.
+"""
+# Importing necesary and relevant modules
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from openalex_client import openalex_id_url, openalex_int_id, chunk_ids, MAX_BATCH_SIZE, MAX_PAGE_SIZE
+from work_cache import fields_key
+from work_registry import WorkRegistry
+
+# Defining constants
+DEFAULT_MAX_WORKS = 200000 # Works kept in memory before the least recently used are dropped
+
+# Defining classes
+class CoalescingClient:
+    """Thread-safe client front that shares fetched works between sessions and coalesces in-flight fetches"""
+    shared = True # Counters cover every session, so run_metrics leaves them out of each session's metrics
+
+    def __init__(self, client, max_works=DEFAULT_MAX_WORKS):
+        self.client = client # OpenAlexClient or any client with the same methods
+        self.max_works = max_works
+        self.works = OrderedDict() # Fetched works keyed by (selected fields, ID URL), least recently used first
+        self.n_shared_hits = 0 # Lookups answered by a work another lookup already fetched
+        self.n_coalesced = 0 # Lookups answered by a fetch that was already in flight
+        self._in_flight = {} # Futures of the fetches in progress keyed like works
+        self._lock = threading.Lock()
+
+    @property
+    def n_requests(self):
+        return self.client.n_requests
+
+    @property
+    def n_bytes(self):
+        return getattr(self.client, "n_bytes", 0)
+
+    @property
+    def cache(self):
+        return getattr(self.client, "cache", None)
+
+    def iter_search_works(self, user_query, fields, max_results=None, per_page=MAX_PAGE_SIZE):
+        """Stream search results straight from the underlying client"""
+        return self.client.iter_search_works(user_query, fields, max_results, per_page)
+
+    def get_work(self, oa_id, fields):
+        """Return a single work, or None when OpenAlex does not have it"""
+        return self.get_works([oa_id], fields).get(openalex_id_url(oa_id))
+
+    def get_works(self, oa_ids, fields):
+        """Return many works keyed by ID URL, fetching only those no session has fetched or is fetching"""
+        fields = list(fields) if "id" in fields else ["id"] + list(fields)
+        key = fields_key(fields)
+        works, waiting, owned = {}, {}, {}
+        with self._lock:
+            for oa_id in dict.fromkeys(openalex_id_url(oa_id) for oa_id in oa_ids):
+                if (key, oa_id) in self.works:
+                    self.works.move_to_end((key, oa_id))
+                    works[oa_id] = self.works[(key, oa_id)]
+                    self.n_shared_hits += 1
+                elif (key, oa_id) in self._in_flight:
+                    waiting[oa_id] = self._in_flight[(key, oa_id)]
+                    self.n_coalesced += 1
+                else:
+                    owned[oa_id] = self._in_flight[(key, oa_id)] = Future()
+        if owned:
+            # Fetch what this lookup owns before waiting on others, so two lookups never wait on each other
+            batches = chunk_ids(list(owned), getattr(self.client, "batch_size", MAX_BATCH_SIZE))
+            if len(batches) == 1:
+                works.update(self._fetch_batch(batches[0], fields, key, owned))
+            else:
+                # As many batches at a time as the client would fetch itself
+                with ThreadPoolExecutor(max_workers=getattr(self.client, "max_concurrency", 1)) as executor:
+                    for batch_works in executor.map(lambda batch: self._fetch_batch(batch, fields, key, owned), batches):
+                        works.update(batch_works)
+        for oa_id, future in waiting.items():
+            work = future.result()
+            if work is not None:
+                works[oa_id] = work
+        return works
+
+    def _fetch_batch(self, batch, fields, key, owned):
+        """Fetch one batch of the IDs a lookup owns and resolve their futures, so lookups waiting on them need not wait for the rest"""
+        try:
+            fetched_works = self.client.get_works(batch, fields)
+        except BaseException as error:
+            with self._lock:
+                for oa_id in batch:
+                    del self._in_flight[(key, oa_id)]
+                    owned[oa_id].set_exception(error)
+            raise
+        works = {}
+        with self._lock:
+            for oa_id in batch:
+                work = fetched_works.get(oa_id)
+                if work is not None:
+                    self.works[(key, oa_id)] = work
+                    works[oa_id] = work
+                del self._in_flight[(key, oa_id)]
+                owned[oa_id].set_result(work)
+            while len(self.works) > self.max_works:
+                self.works.popitem(last=False)
+        return works
+
+    def stats(self):
+        """Counters of the shared works"""
+        with self._lock:
+            return {
+                "works": len(self.works),
+                "in_flight": len(self._in_flight),
+                "shared_hits": self.n_shared_hits,
+                "coalesced": self.n_coalesced,
+                "http_requests": self.n_requests,
+            }
+
+class SharedWorkRegistry(WorkRegistry):
+    """WorkRegistry that many sessions can add to and read from at the same time, each through a SessionRegistry"""
+
+    def __init__(self, max_unpinned_works=DEFAULT_MAX_WORKS):
+        super().__init__()
+        self.max_unpinned_works = max_unpinned_works # Works no open session uses kept for later sessions
+        self.pin_counts = {} # Number of sessions using each work, keyed by integer OpenAlex ID
+        self.unpinned = OrderedDict() # Works no session uses, least recently released first
+        self._lock = threading.Lock()
+
+    def _pin(self, session_registry, node_id):
+        """Mark a work as used by a session so it is not evicted under it. Call with the lock held"""
+        if node_id not in session_registry.pinned_ids:
+            session_registry.pinned_ids.add(node_id)
+            self.pin_counts[node_id] = self.pin_counts.get(node_id, 0) + 1
+            self.unpinned.pop(node_id, None)
+
+    def add(self, work_object, requested_id=None, pinned_by=None):
+        """Register a work object and index its references, pinned for a session when given, returns the registered object"""
+        node_id = work_object["node_id"]
+        with self._lock:
+            registered_object = self.works_by_id.get(node_id)
+            if registered_object is None:
+                references = frozenset(work_object["referenced_works"])
+                for referenced_work in references:
+                    # Lists only ever grow while readers iterate them, a set changing size would stop them
+                    self.cited_by.setdefault(openalex_int_id(referenced_work), []).append(node_id)
+                self.references[node_id] = references
+                # Published after its references, so a session that finds the work also finds them
+                self.works_by_id[node_id] = registered_object = work_object
+                self.unpinned[node_id] = None
+            # Merged works come back under a new ID, the ID they were requested by is published last of all
+            if requested_id is not None and requested_id != node_id and requested_id not in self.works_by_id:
+                self.works_by_id[requested_id] = registered_object
+                self.aliases.setdefault(node_id, []).append(requested_id)
+            if pinned_by is not None:
+                self._pin(pinned_by, node_id)
+            self._evict_unpinned()
+            return registered_object
+
+    def lookup(self, node_id, pinned_by):
+        """Return the work object with this integer OpenAlex ID pinned for a session, or None when it is not registered"""
+        with self._lock:
+            work_object = self.works_by_id.get(node_id)
+            if work_object is not None:
+                self._pin(pinned_by, work_object["node_id"])
+            return work_object
+
+    def unknown_ids(self, oa_ids, pinned_by=None):
+        """OpenAlex IDs among oa_ids that are not registered yet, pinning the registered ones for a session when given"""
+        unknown_ids = []
+        with self._lock:
+            for oa_id in dict.fromkeys(oa_ids):
+                work_object = self.works_by_id.get(openalex_int_id(oa_id))
+                if work_object is None:
+                    unknown_ids.append(oa_id)
+                elif pinned_by is not None:
+                    self._pin(pinned_by, work_object["node_id"])
+        return unknown_ids
+
+    def unpin(self, session_registry, node_ids):
+        """Release works a session no longer uses, forgetting the least recently released beyond max_unpinned_works"""
+        with self._lock:
+            for node_id in set(node_ids) & session_registry.pinned_ids:
+                session_registry.pinned_ids.discard(node_id)
+                self.pin_counts[node_id] -= 1
+                if not self.pin_counts[node_id]:
+                    del self.pin_counts[node_id]
+                    self.unpinned[node_id] = None
+            self._evict_unpinned()
+
+    def _evict_unpinned(self):
+        """Forget the least recently released works beyond max_unpinned_works. Call with the lock held"""
+        evicted_ids = []
+        while len(self.unpinned) > self.max_unpinned_works:
+            evicted_ids.append(self.unpinned.popitem(last=False)[0])
+        if evicted_ids:
+            self._remove(evicted_ids)
+
+    def remove(self, node_ids):
+        """Forget the works with these integer OpenAlex IDs, their aliases and the citations they made"""
+        with self._lock:
+            for node_id in node_ids:
+                self.pin_counts.pop(node_id, None)
+                self.unpinned.pop(node_id, None)
+            self._remove(node_ids)
+
+    def _remove(self, node_ids):
+        """Forget works whatever pins them. Call with the lock held"""
+        for node_id in set(node_ids):
+            self.works_by_id.pop(node_id, None)
+            for alias_id in self.aliases.pop(node_id, ()):
+                del self.works_by_id[alias_id]
+            for referenced_work in self.references.pop(node_id, ()):
+                cited_id = openalex_int_id(referenced_work)
+                # Replaced rather than shrunk in place, readers keep the list they already hold
+                citing_ids = [citing_id for citing_id in self.cited_by.get(cited_id, ()) if citing_id != node_id]
+                if citing_ids:
+                    self.cited_by[cited_id] = citing_ids
+                else:
+                    self.cited_by.pop(cited_id, None)
+
+class SessionRegistry:
+    """One session's view of a SharedWorkRegistry, pinning every work the session finds, looks up or adds.
+    A pinned work is never evicted, so a work the session found is still there with its references when it
+    comes to use it, until the session is released"""
+
+    def __init__(self, shared_registry):
+        self.shared_registry = shared_registry
+        self.works_by_id = shared_registry.works_by_id
+        self.references = shared_registry.references
+        self.cited_by = shared_registry.cited_by
+        self.pinned_ids = set() # Works this session uses, guarded by the lock of the shared registry
+
+    def __contains__(self, node_id):
+        return self.shared_registry.lookup(node_id, self) is not None
+
+    def __len__(self):
+        return len(self.pinned_ids)
+
+    def get(self, node_id, default=None):
+        """Return the work object with this integer OpenAlex ID"""
+        work_object = self.shared_registry.lookup(node_id, self)
+        return work_object if work_object is not None else default
+
+    def add(self, work_object, requested_id=None):
+        """Register a work object in the shared registry and pin it for this session"""
+        return self.shared_registry.add(work_object, requested_id, pinned_by=self)
+
+    def unknown_ids(self, oa_ids):
+        """OpenAlex IDs no session has registered, pinning those already registered for this session"""
+        return self.shared_registry.unknown_ids(oa_ids, pinned_by=self)
+
+    def remove(self, node_ids):
+        """Release works this session no longer needs, other sessions may still be using them"""
+        self.shared_registry.unpin(self, node_ids)
+
+    def release(self):
+        """Release every work of this session once it is closed"""
+        self.shared_registry.unpin(self, list(self.pinned_ids))
@@ -0,0 +1,107 @@
+"""
+Persistent on-disk cache of OpenAlex work responses for GAPRS.
+Entries are stored in SQLite, keyed by work ID and selected fields,
+expire after a configurable TTL and are evicted least recently used
+first once the cache grows beyond its maximum number of entries.
+"""
+# Importing necesary and relevant modules
+import json
+import sqlite3
+import threading
+import time
+
+# Defining constants
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60 # Works rarely change, so keep them for 30 days
+DEFAULT_MAX_ENTRIES = 200000 # Upper bound on cached responses before LRU eviction
+SQLITE_MAX_VARIABLES = 900 # Stay below SQLite's limit on bound parameters per statement
+
+# Defining functions
+def fields_key(fields):
+    """Canonical cache key component for a list of selected fields"""
+    return ",".join(sorted(set(fields)))
+
+# Defining classes
+class WorkCache:
+    """SQLite-backed work cache with TTL expiry, LRU eviction and hit/miss counters"""
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0 # Number of lookups answered from the cache
+        self.misses = 0 # Number of lookups that had to go to OpenAlex
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS works ("
+            "work_id TEXT NOT NULL, fields TEXT NOT NULL, body TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+            "PRIMARY KEY (work_id, fields))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS works_accessed_at ON works (accessed_at)")
+        self._connection.commit()
+
+    def get_many(self, work_ids, fields):
+        """Return a dict of the cached, unexpired works among work_ids for the selected fields"""
+        key, now = fields_key(fields), time.time()
+        works = {}
+        with self._lock:
+            for start in range(0, len(work_ids), SQLITE_MAX_VARIABLES):
+                chunk = work_ids[start:start + SQLITE_MAX_VARIABLES]
+                rows = self._connection.execute(
+                    f"SELECT work_id, body FROM works WHERE fields = ? AND fetched_at >= ? AND work_id IN ({','.join('?' * len(chunk))})",
+                    [key, now - self.ttl_seconds, *chunk],
+                ).fetchall()
+                works.update((work_id, json.loads(body)) for work_id, body in rows)
+            # Mark hits as recently used so they survive eviction
+            self._connection.executemany(
+                "UPDATE works SET accessed_at = ? WHERE work_id = ? AND fields = ?",
+                [(now, work_id, key) for work_id in works],
+            )
+            self._connection.commit()
+            self.hits += len(works)
+            self.misses += len(work_ids) - len(works)
+        return works
+
+    def get(self, work_id, fields):
+        """Return the cached work for the selected fields, or None if it is missing or expired"""
+        return self.get_many([work_id], fields).get(work_id)
+
+    def put_many(self, works, fields):
+        """Store a dict of works fetched with the selected fields and evict the least recently used overflow"""
+        key, now = fields_key(fields), time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO works (work_id, fields, body, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [(work_id, key, json.dumps(work), now, now) for work_id, work in works.items()],
+            )
+            n_entries = self._connection.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+            if n_entries > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM works WHERE rowid IN (SELECT rowid FROM works ORDER BY accessed_at LIMIT ?)",
+                    (n_entries - self.max_entries,),
+                )
+            self._connection.commit()
+
+    def put(self, work_id, work, fields):
+        """Store a single work fetched with the selected fields"""
+        self.put_many({work_id: work}, fields)
+
+    def purge_expired(self):
+        """Delete every entry older than the TTL"""
+        with self._lock:
+            self._connection.execute("DELETE FROM works WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            self._connection.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached entries"""
+        with self._lock:
+            n_entries = self._connection.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "entries": n_entries}
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,61 @@
+"""
+Registry of the works already known to a GAPRS session.
+Holds every ego and alter object keyed by integer OpenAlex ID,
+its frozen reference set and which known works cite it, so that
+incremental expansion only fetches and indexes newly added papers.
+"""
+# Importing necesary and relevant modules
+from openalex_client import openalex_int_id
+
+# Defining classes
+class WorkRegistry:
+    """Known works, their reference sets and an inverted cited-by index, all keyed by integer OpenAlex ID"""
+
+    def __init__(self):
+        self.works_by_id = {} # Ego and alter objects keyed by integer OpenAlex ID
+        self.references = {} # Frozen set of referenced work URLs of each known work
+        self.cited_by = {} # Integer IDs of the known works citing each work
+        self.aliases = {} # Merged-work IDs each work was also requested by
+
+    def __contains__(self, node_id):
+        return node_id in self.works_by_id
+
+    def __len__(self):
+        return len(self.works_by_id)
+
+    def get(self, node_id, default=None):
+        """Return the work object with this integer OpenAlex ID"""
+        return self.works_by_id.get(node_id, default)
+
+    def add(self, work_object, requested_id=None):
+        """Register a work object and index its references, returns the registered object"""
+        node_id = work_object["node_id"]
+        # Merged works come back under a new ID, so also register the ID they were requested by
+        if requested_id is not None and requested_id != node_id and requested_id not in self.works_by_id:
+            self.works_by_id[requested_id] = self.works_by_id.get(node_id, work_object)
+            self.aliases.setdefault(node_id, []).append(requested_id)
+        if node_id in self.works_by_id:
+            return self.works_by_id[node_id]
+        self.works_by_id[node_id] = work_object
+        self.references[node_id] = frozenset(work_object["referenced_works"])
+        for referenced_work in self.references[node_id]:
+            self.cited_by.setdefault(openalex_int_id(referenced_work), set()).add(node_id)
+        return work_object
+
+    def remove(self, node_ids):
+        """Forget the works with these integer OpenAlex IDs, their aliases and the citations they made"""
+        node_ids = set(node_ids)
+        for node_id in node_ids:
+            self.works_by_id.pop(node_id, None)
+            for alias_id in self.aliases.pop(node_id, ()):
+                del self.works_by_id[alias_id]
+            for referenced_work in self.references.pop(node_id, ()):
+                citing_ids = self.cited_by.get(openalex_int_id(referenced_work))
+                if citing_ids is not None:
+                    citing_ids.discard(node_id)
+                    if not citing_ids:
+                        del self.cited_by[openalex_int_id(referenced_work)]
+
+    def unknown_ids(self, oa_ids):
+        """OpenAlex IDs among oa_ids that are not registered yet, in order and without duplicates"""
+        return [oa_id for oa_id in dict.fromkeys(oa_ids) if openalex_int_id(oa_id) not in self.works_by_id]